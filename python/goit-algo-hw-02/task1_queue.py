@@ -3,23 +3,175 @@ from __future__ import annotations
 import itertools
 import queue
 import random
-from dataclasses import dataclass
-from typing import Iterator
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceRequest:
     request_id: int
     payload: str
+    # time.monotonic() readings; slots keep each request to a few words.
+    enqueued_at: Optional[float] = field(default=None, compare=False, repr=False)
+    dequeued_at: Optional[float] = field(default=None, compare=False, repr=False)
+    finished_at: Optional[float] = field(default=None, compare=False, repr=False)
+
+    def mark_enqueued(self) -> None:
+        self.enqueued_at = time.monotonic()
+
+    def mark_dequeued(self) -> None:
+        self.dequeued_at = time.monotonic()
+
+    def mark_finished(self) -> None:
+        self.finished_at = time.monotonic()
+
+    @property
+    def wait_time(self) -> Optional[float]:
+        if self.enqueued_at is None or self.dequeued_at is None:
+            return None
+        return self.dequeued_at - self.enqueued_at
+
+    @property
+    def service_time(self) -> Optional[float]:
+        if self.dequeued_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.dequeued_at
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in the style of HdrHistogram.
+
+    Values are counted in integer ``unit``s. Below ``2**precision_bits`` each
+    value has its own bucket; above that every power-of-two range is split
+    into ``2**(precision_bits - 1)`` equal buckets, so the relative error
+    stays under ``2**(1 - precision_bits)`` with a few hundred counters.
+    Recording is O(1) and percentiles cost one pass over the buckets. The
+    histogram itself is not locked; ``RequestMetrics`` guards shared use.
+    """
+
+    def __init__(
+        self, unit: float = 1e-6, precision_bits: int = 5, max_bits: int = 40
+    ) -> None:
+        self.unit = unit
+        self._bits = precision_bits
+        self._linear = 1 << precision_bits
+        self._half = self._linear >> 1
+        self._max_value = (1 << max_bits) - 1
+        self._counts = [0] * (self._index(self._max_value) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        units = int(value / self.unit)
+        if units < self._linear:
+            index = units if units > 0 else 0
+        else:
+            index = self._index(min(units, self._max_value))
+        self._counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def record_array(self, values: "numpy.ndarray") -> None:
+        """Record a whole NumPy array of values; same buckets as ``record``."""
+        import numpy  # only callers that already hold NumPy arrays get here
+
+        if not len(values):
+            return
+        units = numpy.clip((values / self.unit).astype(numpy.int64), 0, self._max_value)
+        indices = units.copy()
+        large = units >= self._linear
+        if large.any():
+            big = units[large]
+            # frexp's exponent is the bit length of each (exactly stored) value.
+            shift = numpy.frexp(big.astype(numpy.float64))[1] - self._bits
+            indices[large] = (
+                self._linear + (shift - 1) * self._half + (big >> shift) - self._half
+            )
+        added = numpy.bincount(indices, minlength=len(self._counts))
+        for index in numpy.flatnonzero(added).tolist():
+            self._counts[index] += int(added[index])
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.max = max(self.max, float(values.max()))
+
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self._midpoint(index), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def _index(self, units: int) -> int:
+        if units < self._linear:
+            return units
+        shift = units.bit_length() - self._bits
+        return self._linear + (shift - 1) * self._half + (units >> shift) - self._half
+
+    def _midpoint(self, index: int) -> float:
+        if index < self._linear:
+            return index * self.unit
+        shift, offset = divmod(index - self._linear, self._half)
+        shift += 1
+        low = (offset + self._half) << shift
+        return (low + ((1 << shift) - 1) / 2) * self.unit
+
+
+class RequestMetrics:
+    """Wait and service-time histograms fed by finished requests."""
+
+    def __init__(self) -> None:
+        self.waits = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self._lock = threading.Lock()
+
+    def record(self, request: ServiceRequest) -> None:
+        wait, service = request.wait_time, request.service_time
+        with self._lock:
+            if wait is not None:
+                self.waits.record(wait)
+            if service is not None:
+                self.service.record(service)
+
+    def report(self) -> str:
+        with self._lock:
+            return self._format()
+
+    def _format(self) -> str:
+        return "\n".join(
+            f"{name:<8}n={histogram.count} "
+            + " ".join(
+                f"{label}={histogram.percentile(percent) * 1000:.3f}ms"
+                for label, percent in (("p50", 50), ("p95", 95), ("p99", 99))
+            )
+            + f" max={histogram.max * 1000:.3f}ms"
+            for name, histogram in (("wait", self.waits), ("service", self.service))
+        )
 
 
 class RequestGenerator:
     def __init__(self) -> None:
         self._id_source: Iterator[int] = itertools.count(1)
+        self._lock = threading.Lock()
 
     def generate(self) -> ServiceRequest:
+        # Producer threads share one generator, so IDs are drawn under a lock.
+        with self._lock:
+            request_id = next(self._id_source)
         return ServiceRequest(
-            request_id=next(self._id_source),
+            request_id=request_id,
             payload=f"Issue code #{random.randint(1000, 9999)}",
         )
 
@@ -28,29 +180,170 @@ def generate_request(
     request_queue: queue.Queue[ServiceRequest], generator: RequestGenerator
 ) -> None:
     request = generator.generate()
+    request.mark_enqueued()
     request_queue.put(request)
     print(f"Generated request {request.request_id}: {request.payload}")
 
 
-def process_request(request_queue: queue.Queue[ServiceRequest]) -> None:
+def process_request(
+    request_queue: queue.Queue[ServiceRequest],
+    metrics: Optional[RequestMetrics] = None,
+) -> None:
     if request_queue.empty():
         print("No pending requests. Taking a short break.\n")
         return
 
     request = request_queue.get()
+    request.mark_dequeued()
     print(f"Processing request {request.request_id}: {request.payload}\n")
+    request.mark_finished()
+    if metrics is not None:
+        metrics.record(request)
+
 
+def run_simulation(
+    iterations: int = 10,
+    max_new_requests: int = 3,
+    metrics: Optional[RequestMetrics] = None,
+) -> RequestMetrics:
+    """Run the tick loop and print a latency report at the end.
 
-def run_simulation(iterations: int = 10, max_new_requests: int = 3) -> None:
+    Pass a ``RequestMetrics`` to call its ``report()`` while requests are
+    still flowing; the same object is returned afterwards.
+    """
     request_queue: queue.Queue[ServiceRequest] = queue.Queue()
     generator = RequestGenerator()
+    metrics = metrics if metrics is not None else RequestMetrics()
 
     for step in range(1, iterations + 1):
         print(f"--- Tick {step} ---")
         for _ in range(random.randint(1, max_new_requests)):
             generate_request(request_queue, generator)
-        process_request(request_queue)
+        process_request(request_queue, metrics)
+    print(metrics.report())
+    return metrics
 
 
-if __name__ == "__main__":
+@dataclass
+class ThroughputReport:
+    producers: int
+    consumers: int
+    elapsed: float
+    produced: int
+    processed: int
+    # (seconds since start, queue size) pairs taken at a fixed interval.
+    depth_samples: List[Tuple[float, int]] = field(default_factory=list)
+    latency: Optional[RequestMetrics] = None
+
+    @property
+    def throughput(self) -> float:
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def max_depth(self) -> int:
+        return max((depth for _, depth in self.depth_samples), default=0)
+
+    def summary(self) -> str:
+        final_depth = self.depth_samples[-1][1] if self.depth_samples else 0
+        summary = (
+            f"{self.producers} producers / {self.consumers} consumers: "
+            f"{self.produced} generated, {self.processed} processed in "
+            f"{self.elapsed:.2f}s ({self.throughput:.1f} req/s), "
+            f"queue depth max {self.max_depth}, final {final_depth}"
+        )
+        if self.latency is not None:
+            summary += "\n" + self.latency.report()
+        return summary
+
+
+def run_threaded_simulation(
+    producers: int = 2,
+    consumers: int = 2,
+    duration: float = 2.0,
+    service_time: float = 0.005,
+    arrival_interval: float = 0.002,
+    sample_interval: float = 0.1,
+) -> ThroughputReport:
+    """Run producer and consumer threads against one queue for ``duration``.
+
+    Each producer adds a request every ``arrival_interval`` seconds and each
+    consumer spends ``service_time`` seconds per request, so the queue grows
+    whenever arrivals outpace the consumers.
+    """
+    if producers <= 0 or consumers <= 0:
+        raise ValueError("Producer and consumer counts must be positive.")
+    request_queue: queue.Queue[ServiceRequest] = queue.Queue()
+    generator = RequestGenerator()
+    stop = threading.Event()
+    counts = {"produced": 0, "processed": 0}
+    counts_lock = threading.Lock()
+    metrics = RequestMetrics()
+
+    def produce() -> None:
+        while not stop.is_set():
+            request = generator.generate()
+            request.mark_enqueued()
+            request_queue.put(request)
+            with counts_lock:
+                counts["produced"] += 1
+            stop.wait(arrival_interval)
+
+    def consume() -> None:
+        while not stop.is_set():
+            try:
+                request = request_queue.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            request.mark_dequeued()
+            # Stand-in for real work; sleeping releases the GIL like I/O does.
+            time.sleep(service_time)
+            request.mark_finished()
+            metrics.record(request)
+            with counts_lock:
+                counts["processed"] += 1
+            request_queue.task_done()
+
+    threads = [
+        threading.Thread(target=produce, name=f"producer-{index}")
+        for index in range(producers)
+    ] + [
+        threading.Thread(target=consume, name=f"consumer-{index}")
+        for index in range(consumers)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+
+    samples: List[Tuple[float, int]] = []
+    deadline = started + duration
+    while True:
+        now = time.monotonic()
+        samples.append((round(now - started, 3), request_queue.qsize()))
+        if now >= deadline:
+            break
+        time.sleep(min(sample_interval, deadline - now))
+    stop.set()
+    elapsed = time.monotonic() - started
+    for thread in threads:
+        thread.join()
+
+    return ThroughputReport(
+        producers=producers,
+        consumers=consumers,
+        elapsed=elapsed,
+        produced=counts["produced"],
+        processed=counts["processed"],
+        depth_samples=samples,
+        latency=metrics,
+    )
+
+
+def main() -> None:
     run_simulation()
+    for consumers in (1, 2, 4):
+        report = run_threaded_simulation(consumers=consumers, duration=1.0)
+        print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import List, Tuple
+
+from task1_queue import (
+    RequestGenerator,
+    RequestMetrics,
+    ServiceRequest,
+    ThroughputReport,
+)
+
+
+async def run_async_pipeline(
+    total_requests: int = 50_000,
+    producers: int = 4,
+    consumers: int = 20_000,
+    max_queue_size: int = 1_000,
+    service_time: float = 0.05,
+    sample_interval: float = 0.1,
+) -> ThroughputReport:
+    """Push ``total_requests`` through a bounded queue with async workers.
+
+    ``put`` waits while the queue is full, so producers slow down to the
+    consumers' pace and memory is bounded by the queue size plus the
+    requests currently being served, however many are generated.
+    """
+    if producers <= 0 or consumers <= 0 or max_queue_size <= 0:
+        raise ValueError("Producers, consumers and queue size must be positive.")
+    request_queue: asyncio.Queue[ServiceRequest] = asyncio.Queue(max_queue_size)
+    generator = RequestGenerator()
+    counts = {"produced": 0, "processed": 0}
+    metrics = RequestMetrics()
+
+    async def produce(quota: int) -> None:
+        for _ in range(quota):
+            request = generator.generate()
+            request.mark_enqueued()
+            await request_queue.put(request)
+            counts["produced"] += 1
+
+    async def consume() -> None:
+        while True:
+            request = await request_queue.get()
+            request.mark_dequeued()
+            # Stand-in for I/O-bound work; other requests proceed meanwhile.
+            await asyncio.sleep(service_time)
+            request.mark_finished()
+            metrics.record(request)
+            counts["processed"] += 1
+            request_queue.task_done()
+
+    samples: List[Tuple[float, int]] = []
+    started = time.monotonic()
+
+    async def sample() -> None:
+        while True:
+            samples.append(
+                (round(time.monotonic() - started, 3), request_queue.qsize())
+            )
+            await asyncio.sleep(sample_interval)
+
+    workers = [asyncio.create_task(consume()) for _ in range(consumers)]
+    sampler = asyncio.create_task(sample())
+    share, extra = divmod(total_requests, producers)
+    await asyncio.gather(
+        *(produce(share + (index < extra)) for index in range(producers))
+    )
+    await request_queue.join()
+    elapsed = time.monotonic() - started
+
+    for task in [*workers, sampler]:
+        task.cancel()
+    await asyncio.gather(*workers, sampler, return_exceptions=True)
+    samples.append((round(elapsed, 3), request_queue.qsize()))
+
+    return ThroughputReport(
+        producers=producers,
+        consumers=consumers,
+        elapsed=elapsed,
+        produced=counts["produced"],
+        processed=counts["processed"],
+        depth_samples=samples,
+        latency=metrics,
+    )
+
+
+def main() -> None:
+    for consumers in (1_000, 10_000, 20_000):
+        report = asyncio.run(run_async_pipeline(consumers=consumers))
+        print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
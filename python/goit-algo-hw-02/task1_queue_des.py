@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Deque, Dict, List
+
+from task1_queue import LatencyHistogram, ServiceRequest
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - the event loop needs no NumPy
+    np = None
+
+SERVICE_DISTRIBUTIONS = ("exponential", "constant", "uniform")
+# Requests simulated per NumPy block; memory stays flat however many run.
+BLOCK_SIZE = 1 << 16
+
+
+def service_sampler(
+    distribution: str, mean: float, rng: random.Random
+) -> Callable[[], float]:
+    if mean <= 0:
+        raise ValueError("Mean service time must be positive.")
+    if distribution == "exponential":
+        return partial(rng.expovariate, 1 / mean)
+    if distribution == "constant":
+        return itertools.repeat(mean).__next__
+    if distribution == "uniform":
+        return partial(rng.uniform, 0.0, 2 * mean)
+    raise ValueError(
+        f"Service distribution must be one of: {', '.join(SERVICE_DISTRIBUTIONS)}."
+    )
+
+
+@dataclass
+class SimulationReport:
+    requests: int
+    servers: int
+    simulated_time: float
+    busy_time: float
+    wall_seconds: float
+    waits: LatencyHistogram = field(repr=False)
+    # Queue length seen by each arrival; with Poisson arrivals this is also
+    # the time-average distribution of the queue length.
+    queue_lengths: Counter = field(repr=False)
+
+    @property
+    def utilization(self) -> float:
+        if self.simulated_time <= 0:
+            return 0.0
+        return self.busy_time / (self.servers * self.simulated_time)
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def wait_percentiles(self, *percents: float) -> Dict[float, float]:
+        return {percent: self.waits.percentile(percent) for percent in percents}
+
+    def summary(self) -> str:
+        waits = self.wait_percentiles(50, 95, 99)
+        total = sum(self.queue_lengths.values()) or 1
+        mean_length = sum(k * n for k, n in self.queue_lengths.items()) / total
+        return "\n".join(
+            (
+                f"{self.requests} requests on {self.servers} server(s) in "
+                f"{self.wall_seconds:.2f}s ({self.requests_per_second:,.0f} req/s)",
+                f"Simulated time: {self.simulated_time:.1f}, "
+                f"utilization: {self.utilization:.1%}",
+                f"Wait mean {self.waits.mean:.3f}, "
+                f"p50 {waits[50]:.3f}, p95 {waits[95]:.3f}, p99 {waits[99]:.3f}, "
+                f"max {self.waits.max:.3f}",
+                f"Queue length mean {mean_length:.2f}, "
+                f"max {max(self.queue_lengths, default=0)}",
+            )
+        )
+
+
+def simulate(
+    requests: int = 1_000_000,
+    arrival_rate: float = 0.9,
+    mean_service: float = 1.0,
+    servers: int = 1,
+    distribution: str = "exponential",
+    seed: int | None = None,
+    verbose: bool = False,
+) -> SimulationReport:
+    """Simulate a FIFO queue with Poisson arrivals and ``servers`` workers.
+
+    Instead of advancing a clock tick by tick, the loop jumps from arrival
+    to arrival. The only event heap needed holds the time each server next
+    becomes free, so a request costs O(log servers) work. A single server
+    without per-request output is handed to ``simulate_single_server`` when
+    NumPy is installed.
+    """
+    if requests <= 0 or servers <= 0 or arrival_rate <= 0:
+        raise ValueError("Requests, servers and arrival rate must be positive.")
+    if servers == 1 and not verbose and np is not None:
+        return simulate_single_server(
+            requests, arrival_rate, mean_service, distribution, seed
+        )
+    rng = random.Random(seed)
+    next_gap = partial(rng.expovariate, arrival_rate)
+    next_service = service_sampler(distribution, mean_service, rng)
+
+    free_at: List[float] = [0.0] * servers
+    # FIFO start times never decrease, so requests still waiting at a given
+    # moment are a suffix of this deque.
+    pending_starts: Deque[float] = deque()
+    # Waits are in simulated time units; a fixed histogram keeps memory flat
+    # however many requests are simulated.
+    waits = LatencyHistogram(unit=1e-3)
+    queue_lengths: Counter = Counter()
+    busy_time = 0.0
+    now = finished = 0.0
+
+    started = time.perf_counter()
+    for request_id in range(1, requests + 1):
+        now += next_gap()
+        while pending_starts and pending_starts[0] <= now:
+            pending_starts.popleft()
+        queue_lengths[len(pending_starts)] += 1
+
+        start = max(now, free_at[0])
+        service = next_service()
+        end = start + service
+        heapq.heapreplace(free_at, end)
+        if start > now:
+            pending_starts.append(start)
+        waits.record(start - now)
+        busy_time += service
+        if end > finished:
+            finished = end
+
+        if verbose:
+            request = ServiceRequest(request_id, f"Issue code #{request_id}")
+            print(
+                f"t={now:.3f} request {request.request_id}: "
+                f"waits {start - now:.3f}, served {service:.3f}"
+            )
+
+    return SimulationReport(
+        requests=requests,
+        servers=servers,
+        simulated_time=finished,
+        busy_time=busy_time,
+        wall_seconds=time.perf_counter() - started,
+        waits=waits,
+        queue_lengths=queue_lengths,
+    )
+
+
+def simulate_single_server(
+    requests: int = 1_000_000,
+    arrival_rate: float = 0.9,
+    mean_service: float = 1.0,
+    distribution: str = "exponential",
+    seed: int | None = None,
+) -> SimulationReport:
+    """Simulate one FIFO server with NumPy, a block of requests at a time.
+
+    Waits follow the Lindley recursion ``W[n] = max(0, W[n-1] + S[n-1] -
+    gap[n])``, which unrolls to the running sum of ``S - gap`` minus its
+    running minimum, so a block costs a few whole-array operations.
+    """
+    if requests <= 0 or arrival_rate <= 0:
+        raise ValueError("Requests and arrival rate must be positive.")
+    if mean_service <= 0:
+        raise ValueError("Mean service time must be positive.")
+    if distribution not in SERVICE_DISTRIBUTIONS:
+        raise ValueError(
+            f"Service distribution must be one of: {', '.join(SERVICE_DISTRIBUTIONS)}."
+        )
+    rng = np.random.default_rng(seed)
+    waits = LatencyHistogram(unit=1e-3)
+    lengths = np.zeros(1, dtype=np.int64)
+    busy_time = 0.0
+    # State carried between blocks: the last arrival, its wait and service,
+    # and the start times of requests that may still be waiting.
+    now = wait = service = 0.0
+    waiting = np.empty(0)
+    first = True
+
+    started = time.perf_counter()
+    for offset in range(0, requests, BLOCK_SIZE):
+        count = min(BLOCK_SIZE, requests - offset)
+        gaps = rng.exponential(1 / arrival_rate, count)
+        if distribution == "exponential":
+            services = rng.exponential(mean_service, count)
+        elif distribution == "constant":
+            services = np.full(count, mean_service)
+        else:
+            services = rng.uniform(0.0, 2 * mean_service, count)
+
+        arrivals = now + np.cumsum(gaps)
+        # Step n adds the previous service and subtracts the gap before n;
+        # the very first request finds the server idle.
+        steps = np.empty(count)
+        steps[0] = 0.0 if first else service - gaps[0]
+        steps[1:] = services[:-1] - gaps[1:]
+        drift = wait + np.cumsum(steps)
+        block_waits = drift - np.minimum(np.minimum.accumulate(drift), 0.0)
+        starts = arrivals + block_waits
+
+        # FIFO starts never decrease, so the requests still waiting when
+        # request n arrives are the earlier ones with start > arrival[n].
+        pending = np.concatenate((waiting, starts))
+        earlier = len(waiting) + np.arange(count)
+        served = np.minimum(np.searchsorted(pending, arrivals, side="right"), earlier)
+        block_lengths = np.bincount(earlier - served)
+        if len(block_lengths) > len(lengths):
+            block_lengths[: len(lengths)] += lengths
+            lengths = block_lengths
+        else:
+            lengths[: len(block_lengths)] += block_lengths
+
+        waits.record_array(block_waits)
+        busy_time += float(services.sum())
+        now, wait = float(arrivals[-1]), float(block_waits[-1])
+        service = float(services[-1])
+        waiting = pending[pending > now]
+        first = False
+
+    queue_lengths = Counter(
+        {length: int(total) for length, total in enumerate(lengths.tolist()) if total}
+    )
+    return SimulationReport(
+        requests=requests,
+        servers=1,
+        simulated_time=now + wait + service,
+        busy_time=busy_time,
+        wall_seconds=time.perf_counter() - started,
+        waits=waits,
+        queue_lengths=queue_lengths,
+    )
+
+
+def main() -> None:
+    print(simulate(requests=1_000_000, arrival_rate=0.9, seed=1).summary())
+    print()
+    print(simulate(requests=1_000_000, arrival_rate=3.6, servers=4, seed=1).summary())
+
+
+if __name__ == "__main__":
+    main()
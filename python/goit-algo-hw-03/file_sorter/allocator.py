@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class NameAllocator:
+    """Hands out unique file names inside destination folders.
+
+    Each folder is listed once; afterwards names are tracked in memory and a
+    per-name counter remembers the next free ``_N`` suffix, so the N-th
+    ``report.txt`` costs O(1) instead of N ``stat`` calls. Folders are
+    created at most once. All methods are safe to call from several threads.
+    """
+
+    def __init__(self) -> None:
+        self._taken: Dict[Path, Set[str]] = {}
+        # Names held for a known owner (a manifest record) until it claims
+        # them; ``allocate`` never hands them to anyone else.
+        self._reserved: Dict[Path, Set[str]] = {}
+        self._next_suffix: Dict[Tuple[Path, str], int] = {}
+        self._created: Set[Path] = set()
+        self._lock = threading.Lock()
+
+    def allocate(self, directory: Path, name: str) -> Path:
+        with self._lock:
+            taken = self._names_in(directory)
+            if name not in taken:
+                taken.add(name)
+                return directory / name
+
+            stem, suffix = _split_name(name)
+            key = (directory, name)
+            counter = self._next_suffix.get(key, 1)
+            while f"{stem}_{counter}{suffix}" in taken:
+                counter += 1
+            candidate = f"{stem}_{counter}{suffix}"
+            taken.add(candidate)
+            self._next_suffix[key] = counter + 1
+            return directory / candidate
+
+    def reserve(self, path: Path) -> None:
+        with self._lock:
+            self._reserved.setdefault(path.parent, set()).add(path.name)
+            names = self._taken.get(path.parent)
+            if names is not None:
+                names.add(path.name)
+
+    def claim(self, path: Path) -> bool:
+        """Take ``path`` as is; False if it was already handed out or exists.
+
+        A reserved name can be claimed exactly once.
+        """
+        with self._lock:
+            reserved = self._reserved.get(path.parent)
+            if reserved is not None and path.name in reserved:
+                reserved.remove(path.name)
+                return True
+            taken = self._names_in(path.parent)
+            if path.name in taken:
+                return False
+            taken.add(path.name)
+            return True
+
+    def ensure_directory(self, directory: Path) -> None:
+        if directory in self._created:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._created.add(directory)
+
+    def _names_in(self, directory: Path) -> Set[str]:
+        names = self._taken.get(directory)
+        if names is None:
+            names = set()
+            try:
+                with os.scandir(directory) as scanner:
+                    names.update(entry.name for entry in scanner)
+            except FileNotFoundError:
+                pass
+            except OSError as error:
+                logger.warning("Cannot list '%s': %s", directory, error)
+            names.update(self._reserved.get(directory, ()))
+            self._taken[directory] = names
+        return names
+
+
+def _split_name(name: str) -> Tuple[str, str]:
+    path = Path(name)
+    return path.stem, path.suffix
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import tarfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import IO, Dict, Optional, Tuple, Union
+
+from .transfer import BUFFER_SIZE
+
+# format -> (file extension, tarfile stream mode or None for zip)
+ARCHIVE_FORMATS: Dict[str, Tuple[str, Optional[str]]] = {
+    "tar": ("tar", "w|"),
+    "tar.gz": ("tar.gz", "w|gz"),
+    "tar.bz2": ("tar.bz2", "w|bz2"),
+    "tar.xz": ("tar.xz", "w|xz"),
+    "zip": ("zip", None),
+}
+
+
+def index_path(archive: Path) -> Path:
+    return archive.with_name(archive.name + ".index.jsonl")
+
+
+class _Archive:
+    def __init__(self, path: Path, mode: Optional[str]) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        # Exclusive creation: an existing archive is never truncated.
+        self._handle: IO[bytes] = path.open("xb", buffering=BUFFER_SIZE)
+        self._index: IO[str] = index_path(path).open(
+            "x", encoding="utf-8", buffering=BUFFER_SIZE
+        )
+        self._writer: Union[tarfile.TarFile, zipfile.ZipFile]
+        if mode is None:
+            self._writer = zipfile.ZipFile(
+                self._handle, "w", compression=zipfile.ZIP_DEFLATED
+            )
+        else:
+            self._writer = tarfile.open(
+                fileobj=self._handle, mode=mode, bufsize=BUFFER_SIZE
+            )
+
+    def add(self, source: Path, name: str, size: int) -> None:
+        with self.lock:
+            if isinstance(self._writer, zipfile.ZipFile):
+                self._writer.write(source, name)
+                offset = self._writer.infolist()[-1].header_offset
+            else:
+                # Offset of the member header in the uncompressed tar stream.
+                offset = self._writer.offset
+                info = self._writer.gettarinfo(str(source), arcname=name)
+                with source.open("rb") as data:
+                    self._writer.addfile(info, data)
+            entry = {"name": name, "source": str(source), "size": size}
+            self._index.write(json.dumps({**entry, "offset": offset}) + "\n")
+
+    def close(self) -> None:
+        with self.lock:
+            self._writer.close()
+            self._handle.close()
+            self._index.close()
+
+
+class ArchiveSink:
+    """Streams sorted files into one archive per destination folder.
+
+    Every folder becomes ``<folder>.<format>`` plus a JSON-lines index with
+    the member name, source path, size and header offset of each file.
+    If an earlier run left ``<folder>.<format>`` behind, the first free
+    ``<folder>_N.<format>`` is used instead. Archives are written strictly
+    sequentially; different archives can be filled from different threads
+    at the same time.
+    """
+
+    def __init__(self, destination: Path, archive_format: str) -> None:
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(
+                f"Archive format must be one of: {', '.join(ARCHIVE_FORMATS)}."
+            )
+        self.destination = destination
+        self.extension, self._mode = ARCHIVE_FORMATS[archive_format]
+        self._archives: Dict[str, _Archive] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ArchiveSink":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def add(self, folder: str, source: Path, name: str, size: int) -> None:
+        self._archive(folder).add(source, name, size)
+
+    def close(self) -> None:
+        with self._lock:
+            archives, self._archives = list(self._archives.values()), {}
+        for archive in archives:
+            archive.close()
+
+    def _archive(self, folder: str) -> _Archive:
+        with self._lock:
+            archive = self._archives.get(folder)
+            if archive is None:
+                path = self._free_path(folder)
+                archive = self._archives[folder] = _Archive(path, self._mode)
+            return archive
+
+    def _free_path(self, folder: str) -> Path:
+        # With --move an earlier archive may hold the only copy of its files.
+        path = self.destination / f"{folder}.{self.extension}"
+        counter = 1
+        while path.exists() or index_path(path).exists():
+            path = self.destination / f"{folder}_{counter}.{self.extension}"
+            counter += 1
+        return path
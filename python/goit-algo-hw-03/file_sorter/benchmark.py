@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from .demo import create_demo_environment
+from .sorter import FileSorter
+from .walker import walk_files
+
+CHUNK = os.urandom(1 << 20)
+EXTENSIONS = ("txt", "jpg", "json", "log", "csv", "bin", "md", "")
+DEFAULT_PATH_MAX = 4096
+# Room left at the bottom of the deep tree for a file name and its separator.
+NAME_HEADROOM = 64
+
+
+def _write(path: Path, size: int) -> int:
+    with path.open("wb") as handle:
+        remaining = size
+        while remaining > 0:
+            piece = CHUNK[: min(remaining, len(CHUNK))]
+            handle.write(piece)
+            remaining -= len(piece)
+    return size
+
+
+def _name(index: int) -> str:
+    extension = EXTENSIONS[index % len(EXTENSIONS)]
+    return f"file_{index}.{extension}" if extension else f"file_{index}"
+
+
+def build_wide_flat(source: Path, scale: float) -> None:
+    for index in range(int(5000 * scale)):
+        _write(source / _name(index), 512)
+
+
+def _path_max(path: Path) -> int:
+    try:
+        return os.pathconf(path, "PC_PATH_MAX")
+    except (AttributeError, OSError, ValueError):
+        return DEFAULT_PATH_MAX
+
+
+def build_deep_narrow(source: Path, scale: float) -> None:
+    # Every level adds "/d" to the path, so the depth is capped to keep the
+    # deepest file path below PATH_MAX whatever the scale.
+    depth_limit = (_path_max(source) - len(os.fspath(source)) - NAME_HEADROOM) // 2
+    directory = source
+    for level in range(min(int(400 * scale), depth_limit)):
+        directory = directory / "d"
+        directory.mkdir()
+        _write(directory / _name(level), 512)
+
+
+def build_tiny_files(source: Path, scale: float) -> None:
+    per_directory = 1000
+    for index in range(int(20000 * scale)):
+        directory = source / f"batch_{index // per_directory}"
+        if index % per_directory == 0:
+            directory.mkdir()
+        _write(directory / _name(index), 16)
+
+
+def build_huge_files(source: Path, scale: float) -> None:
+    for index in range(4):
+        _write(source / f"media_{index}.mkv", int(64 * (1 << 20) * scale))
+
+
+def build_name_collisions(source: Path, scale: float) -> None:
+    for index in range(int(2000 * scale)):
+        directory = source / f"copy_{index}"
+        directory.mkdir()
+        _write(directory / "report.txt", 256)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    build: Callable[[Path, float], None]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("wide_flat", build_wide_flat),
+        Scenario("deep_narrow", build_deep_narrow),
+        Scenario("tiny_files", build_tiny_files),
+        Scenario("huge_files", build_huge_files),
+        Scenario("name_collisions", build_name_collisions),
+    )
+}
+
+
+def remove_tree(root: Path) -> None:
+    """Delete a directory tree without recursion.
+
+    ``shutil.rmtree`` recurses once per level and fails on trees as deep as
+    the ``deep_narrow`` scenario builds.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        directory = stack[-1]
+        subdirectories = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                else:
+                    os.unlink(entry.path)
+        if subdirectories:
+            stack.extend(subdirectories)
+        else:
+            os.rmdir(directory)
+            stack.pop()
+
+
+def _tree_size(source: Path) -> Tuple[int, int]:
+    files = total = 0
+    for entry in walk_files(source):
+        files += 1
+        total += entry.stat().st_size
+    return files, total
+
+
+def _hotspots(profile: cProfile.Profile, limit: int) -> List[Dict[str, Any]]:
+    # Built-in functions (filename "~") are where the sorter enters C code:
+    # stat, scandir, open, copy_file_range and friends.
+    stats = pstats.Stats(profile)
+    rows = [
+        {
+            "function": function,
+            "calls": calls,
+            "seconds": round(own_time, 6),
+        }
+        for (filename, _, function), (_, calls, own_time, _, _) in stats.stats.items()
+        if filename == "~"
+    ]
+    rows.sort(key=lambda row: row["seconds"], reverse=True)
+    return rows[:limit]
+
+
+def run_scenario(
+    scenario: Scenario,
+    base_dir: Path,
+    scale: float,
+    workers: int,
+    profile: bool = False,
+    hotspot_limit: int = 8,
+) -> Dict[str, Any]:
+    source, destination = create_demo_environment(base_dir / f"demo_{scenario.name}")
+    try:
+        scenario.build(source, scale)
+        files, total_bytes = _tree_size(source)
+
+        started = time.perf_counter()
+        FileSorter(source, destination, workers=workers).sort()
+        elapsed = time.perf_counter() - started
+
+        result: Dict[str, Any] = {
+            "scenario": scenario.name,
+            "scale": scale,
+            "workers": workers,
+            "files": files,
+            "bytes": total_bytes,
+            "seconds": round(elapsed, 6),
+            "files_per_s": round(files / elapsed, 2) if elapsed else None,
+            "bytes_per_s": round(total_bytes / elapsed, 2) if elapsed else None,
+        }
+
+        if profile:
+            # cProfile only sees the calling thread, so the profiled pass always
+            # runs single-threaded into a fresh destination.
+            remove_tree(destination)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            FileSorter(source, destination, workers=1).sort()
+            profiler.disable()
+            result["hotspots"] = _hotspots(profiler, hotspot_limit)
+    finally:
+        remove_tree(source.parent)
+    return result
+
+
+def run_benchmarks(
+    names: Iterable[str],
+    scale: float,
+    workers: Iterable[int],
+    base_dir: Path,
+    profile: bool = False,
+) -> Iterable[Dict[str, Any]]:
+    for name in names:
+        for worker_count in workers:
+            yield run_scenario(SCENARIOS[name], base_dir, scale, worker_count, profile)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time FileSorter.sort() on generated synthetic trees."
+    )
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run; repeat for several (default: all).",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for file counts, depth and sizes (default: 1.0).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1],
+        help="Worker counts to compare (default: 1).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Add a single-threaded profiled pass and report C-level hotspots.",
+    )
+    parser.add_argument(
+        "--base-dir",
+        dest="base_dir",
+        type=Path,
+        default=None,
+        help="Where trees are generated (default: a temporary directory).",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Append JSON lines to this file instead of printing them.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+    names = args.scenarios or list(SCENARIOS)
+    base_dir = args.base_dir or Path(tempfile.mkdtemp(prefix="file_sorter_bench_"))
+    output = args.output.open("a", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for result in run_benchmarks(
+            names, args.scale, args.workers, base_dir, args.profile
+        ):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if args.base_dir is None:
+            try:
+                remove_tree(base_dir)
+            except OSError as error:
+                print(f"Could not remove '{base_dir}': {error}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
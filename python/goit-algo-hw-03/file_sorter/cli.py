@@ -4,8 +4,34 @@ import argparse
 import logging
 from pathlib import Path
 
+from .archive import ARCHIVE_FORMATS
+from .dedup import DEDUP_MODES
 from .demo import create_demo_environment
+from .plan import SortPlan
+from .rules import RuleSet
 from .sorter import FileSorter
+from .watch import SourceWatcher
+
+
+def non_negative_float(value: str) -> float:
+    parsed = float(value)
+    if parsed < 0:
+        raise argparse.ArgumentTypeError("Interval must be >= 0.")
+    return parsed
+
+
+def positive_float(value: str) -> float:
+    parsed = float(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("Interval must be > 0.")
+    return parsed
+
+
+def positive_int(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("Number of workers must be > 0.")
+    return parsed
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -32,12 +58,92 @@ def parse_arguments() -> argparse.Namespace:
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
         help="Configure verbosity of diagnostic output.",
     )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=1,
+        help="Number of files copied concurrently (default: 1).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Copy only new or changed files using the manifest in the destination.",
+    )
+    parser.add_argument(
+        "--dedup",
+        choices=DEDUP_MODES,
+        default=None,
+        help="Hardlink or skip files whose content was already sorted.",
+    )
+    parser.add_argument(
+        "--rules",
+        type=Path,
+        default=None,
+        help="JSON file with routing and exclusion rules.",
+    )
+    parser.add_argument(
+        "--archive",
+        choices=ARCHIVE_FORMATS,
+        default=None,
+        help="Write one archive per folder instead of individual files.",
+    )
+    parser.add_argument(
+        "--move",
+        action="store_true",
+        help="Move files instead of copying and remove emptied source folders.",
+    )
+    parser.add_argument(
+        "--progress",
+        type=non_negative_float,
+        default=5.0,
+        help="Seconds between progress lines; 0 disables them (default: 5).",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        dest="metrics_out",
+        type=Path,
+        default=None,
+        help="Write the final counters as JSON to this file.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and sort new or changed files (implies --incremental).",
+    )
+    parser.add_argument(
+        "--interval",
+        type=positive_float,
+        default=10.0,
+        help="Seconds between scans in --watch mode (default: 10).",
+    )
+    parser.add_argument(
+        "--plan-out",
+        dest="plan_out",
+        type=Path,
+        default=None,
+        help="Write the source-to-target plan as JSON and exit without copying.",
+    )
+    parser.add_argument(
+        "--execute-plan",
+        dest="execute_plan",
+        type=Path,
+        default=None,
+        help="Copy the files listed in a plan created with --plan-out.",
+    )
     parser.add_argument(
         "--demo",
         action="store_true",
         help="Generate sample files automatically and sort them.",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.watch and args.metrics_out is not None:
+        parser.error("--metrics-out cannot be combined with --watch.")
+    if args.execute_plan is not None:
+        # The plan already fixes the layout and the mode it was made for.
+        for option in ("incremental", "dedup", "move", "archive", "rules", "watch"):
+            if getattr(args, option) not in (None, False):
+                parser.error(f"--{option} cannot be combined with --execute-plan.")
+    return args
 
 
 def configure_logging(level: str) -> None:
@@ -47,32 +153,124 @@ def configure_logging(level: str) -> None:
     )
 
 
+def log_results(sorter: FileSorter) -> None:
+    logging.info(
+        "Files from '%s' were %s to '%s' grouped by extension.",
+        sorter.source,
+        "moved" if sorter.move else "copied",
+        sorter.destination,
+    )
+    for strategy, totals in sorter.transfer.summary().items():
+        logging.info(
+            "Transferred %d files (%d bytes) via %s.",
+            totals["files"],
+            totals["bytes"],
+            strategy,
+        )
+    if sorter.duplicates is not None and sorter.duplicates.duplicates:
+        logging.info(
+            "Deduplicated %d files, saved %d bytes.",
+            sorter.duplicates.duplicates,
+            sorter.duplicates.bytes_saved,
+        )
+    snapshot = sorter.metrics.snapshot()
+    logging.info(
+        "%d files scanned, %d transferred, %d unchanged, %d errors in %.2f s "
+        "(%.1f files/s, %.2f MB/s).",
+        snapshot["files_scanned"],
+        snapshot["files_copied"],
+        snapshot["files_skipped"],
+        snapshot["errors"],
+        snapshot["elapsed_s"],
+        snapshot["files_per_s"],
+        snapshot["mb_per_s"],
+    )
+
+
+def write_metrics(sorter: FileSorter, path: Path) -> None:
+    extra = {"strategies": sorter.transfer.summary()}
+    if sorter.duplicates is not None:
+        extra["deduplicated"] = {
+            "files": sorter.duplicates.duplicates,
+            "bytes_saved": sorter.duplicates.bytes_saved,
+        }
+    sorter.metrics.dump(path, **extra)
+
+
 def main() -> None:
     args = parse_arguments()
     configure_logging(args.log_level)
 
-    if args.demo:
-        source, destination = create_demo_environment()
-        logging.info(
-            "Demo environment created at '%s'. Destination: '%s'.",
+    try:
+        plan = None
+        if args.execute_plan is not None:
+            plan = SortPlan.load(args.execute_plan)
+            source, destination = plan.source, plan.destination
+        elif args.demo:
+            source, destination = create_demo_environment()
+            logging.info(
+                "Demo environment created at '%s'. Destination: '%s'.",
+                source,
+                destination,
+            )
+        else:
+            if args.source is None:
+                raise SystemExit("Source path is required unless --demo is used.")
+            source = args.source
+            destination = args.destination
+
+        rules = RuleSet.load(args.rules) if args.rules is not None else RuleSet()
+        if plan is not None:
+            mode = plan.mode
+        else:
+            mode = {
+                "incremental": args.incremental or args.watch,
+                "dedup": args.dedup,
+                "move": args.move,
+                "archive": args.archive,
+            }
+        sorter = FileSorter(
             source,
             destination,
+            workers=args.workers,
+            progress_interval=args.progress,
+            rules=rules,
+            **mode,
         )
-    else:
-        if args.source is None:
-            raise SystemExit("Source path is required unless --demo is used.")
-        source = args.source
-        destination = args.destination
+        if args.plan_out is not None:
+            plan = sorter.plan()
+            plan.save(args.plan_out)
+            summary = plan.summary()
+            logging.info(
+                "Plan with %d files (%d bytes to copy) written to '%s'.",
+                summary["files"],
+                summary["bytes"],
+                args.plan_out,
+            )
+            return
 
-    try:
-        sorter = FileSorter(source, destination)
-        sorter.sort()
-        logging.info(
-            "Files from '%s' were copied to '%s' grouped by extension.",
-            sorter.source,
-            sorter.destination,
-        )
-    except (FileNotFoundError, NotADirectoryError) as error:
+        if args.watch:
+            logging.info(
+                "Watching '%s' every %.1f s. Press Ctrl+C to stop.",
+                sorter.source,
+                args.interval,
+            )
+            try:
+                SourceWatcher(sorter, args.interval).run()
+            except KeyboardInterrupt:
+                logging.info("Watch stopped.")
+            return
+
+        try:
+            if plan is not None:
+                sorter.execute(plan)
+            else:
+                sorter.sort()
+        finally:
+            if args.metrics_out is not None:
+                write_metrics(sorter, args.metrics_out)
+        log_results(sorter)
+    except (FileNotFoundError, NotADirectoryError, ValueError) as error:
         logging.error(error)
         raise SystemExit(1) from error
 
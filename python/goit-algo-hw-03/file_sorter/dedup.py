@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1 << 20
+DEDUP_MODES = ("hardlink", "skip")
+
+
+def file_digest(path: Path) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with path.open("rb", buffering=0) as handle:
+        while True:
+            read = handle.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.digest()
+
+
+@dataclass
+class _Original:
+    source: Path
+    target: Path
+    digest: Optional[bytes] = None
+    copied: bool = False
+    ready: threading.Event = field(default_factory=threading.Event)
+
+
+class DuplicateIndex:
+    """Finds files whose content was already sorted during this run.
+
+    Files are grouped by size first; a file is only hashed once another file
+    of the same size shows up, so unique sizes never cost a read.
+    """
+
+    def __init__(self) -> None:
+        self._by_size: Dict[int, List[_Original]] = {}
+        self._by_target: Dict[Path, _Original] = {}
+        self._last_digest: Optional[Tuple[Path, bytes]] = None
+        self._lock = threading.Lock()
+        self.duplicates = 0
+        self.bytes_saved = 0
+
+    def find(self, source: Path, size: int) -> Path | None:
+        candidates = self._by_size.get(size)
+        if not candidates or size == 0:
+            return None
+
+        digest = self._digest(source)
+        if digest is None:
+            return None
+        for original in candidates:
+            if original.digest is None:
+                original.digest = self._original_digest(original)
+            if original.digest == digest:
+                return original.target
+        self._last_digest = (source, digest)
+        return None
+
+    def add(self, source: Path, size: int, target: Path, copied: bool = False) -> None:
+        digest = None
+        if self._last_digest is not None and self._last_digest[0] == source:
+            digest = self._last_digest[1]
+        self._last_digest = None
+
+        original = _Original(source, target, digest)
+        self._by_size.setdefault(size, []).append(original)
+        self._by_target[target] = original
+        if copied:
+            self.mark_done(target, True)
+
+    def expect(self, target: Path) -> None:
+        if target not in self._by_target:
+            self._by_target[target] = _Original(target, target)
+
+    def mark_done(self, target: Path, copied: bool) -> None:
+        original = self._by_target.get(target)
+        if original is None:
+            return
+        original.copied = copied
+        original.ready.set()
+
+    def release(self, target: Path) -> None:
+        """Mark ``target`` as not copied unless it was already marked done."""
+        original = self._by_target.get(target)
+        if original is not None and not original.ready.is_set():
+            original.ready.set()
+
+    def wait_for(self, target: Path) -> bool:
+        original = self._by_target.get(target)
+        if original is None:
+            return target.exists()
+        original.ready.wait()
+        return original.copied
+
+    def record_saving(self, size: int) -> None:
+        with self._lock:
+            self.duplicates += 1
+            self.bytes_saved += size
+
+    def _original_digest(self, original: _Original) -> bytes | None:
+        if original.source.exists():
+            return self._digest(original.source)
+        # When moving, the source is gone once its task finished; the sorted
+        # file has the same content.
+        if original.ready.wait() and original.copied:
+            return self._digest(original.target)
+        return None
+
+    @staticmethod
+    def _digest(path: Path) -> bytes | None:
+        try:
+            return file_digest(path)
+        except OSError as error:
+            logger.warning("Cannot hash '%s': %s", path, error)
+            return None
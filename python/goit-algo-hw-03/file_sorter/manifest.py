@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, IO, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".file_sorter_manifest.jsonl"
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    target: str
+
+    def matches(self, size: int, mtime_ns: int) -> bool:
+        return self.size == size and self.mtime_ns == mtime_ns
+
+
+class CopyManifest:
+    """Append-only record of finished copies stored in the destination.
+
+    Every completed copy is appended as one JSON line and flushed, so an
+    interrupted run keeps everything it managed to copy. Later lines win over
+    earlier ones; ``close`` rewrites the file with one line per source.
+    """
+
+    def __init__(self, destination: Path) -> None:
+        self.path = destination / MANIFEST_NAME
+        self._entries: Dict[str, ManifestEntry] = {}
+        # How many sources map to each target; more than one means the file
+        # was deduplicated with "skip" and belongs to all of them.
+        self._references: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._handle: Optional[IO[str]] = None
+        self._destination = destination
+
+    def __enter__(self) -> "CopyManifest":
+        self.open()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def load(self) -> None:
+        self._entries = self._load()
+        self._references = Counter(entry.target for entry in self._entries.values())
+
+    def open(self) -> None:
+        self.load()
+        self._handle = self.path.open("a", encoding="utf-8")
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        self._handle.close()
+        self._handle = None
+        self._compact()
+
+    def lookup(self, source: Path) -> ManifestEntry | None:
+        return self._entries.get(str(source))
+
+    def target_of(self, entry: ManifestEntry) -> Path:
+        return self._destination / entry.target
+
+    def targets(self) -> Iterator[Path]:
+        for target in self._references:
+            yield self._destination / target
+
+    def is_shared(self, entry: ManifestEntry) -> bool:
+        with self._lock:
+            return self._references[entry.target] > 1
+
+    def record(self, source: Path, size: int, mtime_ns: int, target: Path) -> None:
+        entry = ManifestEntry(
+            size=size,
+            mtime_ns=mtime_ns,
+            target=target.relative_to(self._destination).as_posix(),
+        )
+        line = json.dumps({"source": str(source), **entry.__dict__})
+        with self._lock:
+            if self._handle is None:
+                raise RuntimeError("Manifest is not open.")
+            previous = self._entries.get(str(source))
+            if previous is not None:
+                self._references[previous.target] -= 1
+            self._references[entry.target] += 1
+            self._entries[str(source)] = entry
+            self._handle.write(line + "\n")
+            self._handle.flush()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> Dict[str, ManifestEntry]:
+        entries: Dict[str, ManifestEntry] = {}
+        try:
+            handle = self.path.open("r", encoding="utf-8")
+        except FileNotFoundError:
+            return entries
+
+        with handle:
+            for number, line in enumerate(handle, start=1):
+                try:
+                    raw = json.loads(line)
+                    entries[raw["source"]] = ManifestEntry(
+                        size=int(raw["size"]),
+                        mtime_ns=int(raw["mtime_ns"]),
+                        target=raw["target"],
+                    )
+                except (ValueError, KeyError, TypeError):
+                    # A run killed mid-write leaves a truncated last line.
+                    logger.warning(
+                        "Ignoring malformed manifest line %d in '%s'.",
+                        number,
+                        self.path,
+                    )
+        return entries
+
+    def _compact(self) -> None:
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        with temporary.open("w", encoding="utf-8") as handle:
+            for source, entry in self._entries.items():
+                handle.write(json.dumps({"source": source, **entry.__dict__}) + "\n")
+        os.replace(temporary, self.path)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MEGABYTE = 1 << 20
+
+
+class SortMetrics:
+    """Thread-safe counters updated by the sorter while it runs."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.files_scanned = 0
+        self.files_copied = 0
+        self.bytes_copied = 0
+        self.files_skipped = 0
+        self.errors = 0
+        self.extensions: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"files": 0, "bytes": 0}
+        )
+
+    def scanned(self) -> None:
+        with self._lock:
+            self.files_scanned += 1
+
+    def skipped(self) -> None:
+        with self._lock:
+            self.files_skipped += 1
+
+    def copied(self, extension: str, size: int) -> None:
+        with self._lock:
+            self.files_copied += 1
+            self.bytes_copied += size
+            totals = self.extensions[extension]
+            totals["files"] += 1
+            totals["bytes"] += size
+
+    def error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def finish(self) -> None:
+        self.finished = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = self.elapsed
+            return {
+                "elapsed_s": round(elapsed, 3),
+                "files_scanned": self.files_scanned,
+                "files_copied": self.files_copied,
+                "files_skipped": self.files_skipped,
+                "bytes_copied": self.bytes_copied,
+                "errors": self.errors,
+                "files_per_s": _rate(self.files_copied, elapsed),
+                "mb_per_s": _rate(self.bytes_copied / MEGABYTE, elapsed),
+                "extensions": {
+                    extension: dict(totals)
+                    for extension, totals in sorted(self.extensions.items())
+                },
+            }
+
+    def dump(self, path: Path, **extra: Any) -> None:
+        with path.open("w", encoding="utf-8") as handle:
+            json.dump({**self.snapshot(), **extra}, handle, indent=2)
+
+
+class ProgressReporter:
+    """Logs a progress line every ``interval`` seconds from a daemon thread.
+
+    Rates in the line cover only the last interval, so a stall on slow
+    storage shows up immediately instead of being averaged away.
+    """
+
+    def __init__(self, metrics: SortMetrics, interval: float) -> None:
+        self.metrics = metrics
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop, name="file-sorter-progress", daemon=True
+        )
+
+    def __enter__(self) -> "ProgressReporter":
+        if self.interval > 0:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _loop(self) -> None:
+        last_time = time.monotonic()
+        last_files, last_bytes = 0, 0
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            snapshot = self.metrics.snapshot()
+            window = now - last_time
+            files, copied = snapshot["files_copied"], snapshot["bytes_copied"]
+            logger.info(
+                "Progress: %d scanned, %d copied (%.1f MB), %d errors | "
+                "%.1f files/s, %.2f MB/s",
+                snapshot["files_scanned"],
+                files,
+                copied / MEGABYTE,
+                snapshot["errors"],
+                _rate(files - last_files, window),
+                _rate((copied - last_bytes) / MEGABYTE, window),
+            )
+            last_time, last_files, last_bytes = now, files, copied
+
+
+def _rate(amount: float, seconds: float) -> float:
+    return round(amount / seconds, 2) if seconds > 0 else 0.0
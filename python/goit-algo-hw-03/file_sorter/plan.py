@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PLAN_VERSION = 2
+
+COPY = "copy"
+LINK = "link"
+SKIP = "skip"
+
+
+@dataclass(frozen=True)
+class CopyTask:
+    source: Path
+    target: Path
+    size: int
+    mtime_ns: int
+    action: str = COPY
+    original: Optional[Path] = None
+
+
+@dataclass
+class SortPlan:
+    source: Path
+    destination: Path
+    tasks: List[CopyTask] = field(default_factory=list)
+    # The sorter settings the targets were planned for; executing the plan
+    # with other settings would write a different layout.
+    incremental: bool = False
+    dedup: Optional[str] = None
+    move: bool = False
+    archive: Optional[str] = None
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(task.size for task in self.tasks if task.action == COPY)
+
+    def largest_first(self) -> List[CopyTask]:
+        # The sort is stable, so a duplicate still follows its original,
+        # which always has the same size.
+        return sorted(self.tasks, key=lambda task: task.size, reverse=True)
+
+    @property
+    def mode(self) -> Dict[str, Any]:
+        return {
+            "incremental": self.incremental,
+            "dedup": self.dedup,
+            "move": self.move,
+            "archive": self.archive,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        actions = Counter(task.action for task in self.tasks)
+        return {
+            "files": len(self.tasks),
+            "bytes": self.total_bytes,
+            "actions": dict(actions),
+        }
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "version": PLAN_VERSION,
+            "source": str(self.source),
+            "destination": str(self.destination),
+            "mode": self.mode,
+            **self.summary(),
+            "tasks": [self._encode(task) for task in self.tasks],
+        }
+        with path.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=1)
+
+    @classmethod
+    def load(cls, path: Path) -> "SortPlan":
+        with path.open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        if payload.get("version") != PLAN_VERSION:
+            raise ValueError(f"Unsupported plan version in '{path}'.")
+
+        mode = payload.get("mode", {})
+        plan = cls(
+            Path(payload["source"]),
+            Path(payload["destination"]),
+            incremental=bool(mode.get("incremental", False)),
+            dedup=mode.get("dedup"),
+            move=bool(mode.get("move", False)),
+            archive=mode.get("archive"),
+        )
+        plan.tasks = [plan._decode(raw) for raw in payload["tasks"]]
+        return plan
+
+    def _encode(self, task: CopyTask) -> Dict[str, Any]:
+        encoded: Dict[str, Any] = {
+            "source": task.source.relative_to(self.source).as_posix(),
+            "target": task.target.relative_to(self.destination).as_posix(),
+            "size": task.size,
+            "mtime_ns": task.mtime_ns,
+            "action": task.action,
+        }
+        if task.original is not None:
+            encoded["original"] = task.original.relative_to(self.destination).as_posix()
+        return encoded
+
+    def _decode(self, raw: Dict[str, Any]) -> CopyTask:
+        original = raw.get("original")
+        return CopyTask(
+            source=self.source / raw["source"],
+            target=self.destination / raw["target"],
+            size=int(raw["size"]),
+            mtime_ns=int(raw["mtime_ns"]),
+            action=raw.get("action", COPY),
+            original=self.destination / original if original else None,
+        )
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import bisect
+import fnmatch
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Mapping, Optional, Pattern, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_FOLDER = "unknown"
+
+
+def normalize_extension(suffix: str) -> str:
+    clean_suffix = suffix.lower().lstrip(".")
+    return clean_suffix if clean_suffix else UNKNOWN_FOLDER
+
+
+def _compile_globs(patterns: Sequence[str]) -> Optional[Pattern[str]]:
+    # One alternation with a named group per pattern: a single regex match
+    # per file, and ``lastgroup`` tells which pattern won.
+    if not patterns:
+        return None
+    parts = [
+        f"(?P<g{index}>{fnmatch.translate(pattern)})"
+        for index, pattern in enumerate(patterns)
+    ]
+    return re.compile("|".join(parts))
+
+
+def _folder_name(value: Any, rule: str) -> str:
+    if not isinstance(value, str) or value in {"", ".", ".."} or "/" in value:
+        raise ValueError(f"Invalid target folder {value!r} in {rule} rule.")
+    return value
+
+
+class RuleSet:
+    """Routing and exclusion rules compiled once into lookup tables.
+
+    A file goes to the folder of the first matching rule, in this order:
+    glob patterns, size thresholds, the extension map, magic bytes, and
+    finally its own lower-cased extension. Exclusions by name are checked
+    during the walk, before the file is even stat-ed.
+    """
+
+    def __init__(
+        self,
+        extensions: Optional[Mapping[str, str]] = None,
+        globs: Optional[Mapping[str, str]] = None,
+        sizes: Sequence[Tuple[int, str]] = (),
+        magic: Optional[Mapping[bytes, str]] = None,
+        exclude_hidden: bool = False,
+        exclude_globs: Sequence[str] = (),
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ) -> None:
+        self._extensions = {
+            normalize_extension(extension): _folder_name(folder, "extension")
+            for extension, folder in (extensions or {}).items()
+        }
+        glob_items = list((globs or {}).items())
+        self._glob_pattern = _compile_globs([pattern for pattern, _ in glob_items])
+        self._glob_folders = [_folder_name(folder, "glob") for _, folder in glob_items]
+
+        ordered = sorted(
+            (int(minimum), _folder_name(folder, "size")) for minimum, folder in sizes
+        )
+        self._size_minimums = [minimum for minimum, _ in ordered]
+        self._size_folders = [folder for _, folder in ordered]
+
+        self._magic = {
+            bytes(signature): _folder_name(folder, "magic")
+            for signature, folder in (magic or {}).items()
+        }
+        self._magic_lengths = sorted(
+            {len(signature) for signature in self._magic}, reverse=True
+        )
+        self._header_size = self._magic_lengths[0] if self._magic_lengths else 0
+
+        self._exclude_hidden = exclude_hidden
+        self._exclude_pattern = _compile_globs(list(exclude_globs))
+        self._min_size = min_size
+        self._max_size = max_size
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "RuleSet":
+        exclude = config.get("exclude", {})
+        try:
+            return cls(
+                extensions=config.get("extensions"),
+                globs=config.get("globs"),
+                sizes=[
+                    (int(rule["min_bytes"]), rule["folder"])
+                    for rule in config.get("sizes", [])
+                ],
+                magic={
+                    bytes.fromhex(signature): folder
+                    for signature, folder in config.get("magic", {}).items()
+                },
+                exclude_hidden=bool(exclude.get("hidden", False)),
+                exclude_globs=exclude.get("globs", []),
+                min_size=exclude.get("min_size"),
+                max_size=exclude.get("max_size"),
+            )
+        except (KeyError, TypeError, AttributeError) as error:
+            raise ValueError(f"Invalid rule configuration: {error}") from error
+
+    @classmethod
+    def load(cls, path: Path) -> "RuleSet":
+        with path.open("r", encoding="utf-8") as handle:
+            return cls.from_config(json.load(handle))
+
+    def excludes_name(self, name: str, is_dir: bool) -> bool:
+        if self._exclude_hidden and name.startswith("."):
+            return True
+        if is_dir or self._exclude_pattern is None:
+            return False
+        return self._exclude_pattern.match(name) is not None
+
+    def excludes_size(self, size: int) -> bool:
+        if self._min_size is not None and size < self._min_size:
+            return True
+        return self._max_size is not None and size > self._max_size
+
+    def classify(self, name: str, size: int, path: Path) -> str:
+        if self._glob_pattern is not None:
+            match = self._glob_pattern.match(name)
+            if match is not None:
+                return self._glob_folders[int(match.lastgroup[1:])]
+
+        if self._size_minimums:
+            index = bisect.bisect_right(self._size_minimums, size) - 1
+            if index >= 0:
+                return self._size_folders[index]
+
+        extension = normalize_extension(os.path.splitext(name)[1])
+        folder = self._extensions.get(extension)
+        if folder is not None:
+            return folder
+
+        if self._header_size:
+            folder = self._sniff(path)
+            if folder is not None:
+                return folder
+        return extension
+
+    def _sniff(self, path: Path) -> str | None:
+        try:
+            with open(path, "rb", buffering=0) as handle:
+                header = handle.read(self._header_size)
+        except OSError as error:
+            logger.debug("Cannot read header of '%s': %s", path, error)
+            return None
+        for length in self._magic_lengths:
+            folder = self._magic.get(header[:length])
+            if folder is not None:
+                return folder
+        return None
@@ -1,82 +1,454 @@
 from __future__ import annotations
 
+import heapq
 import logging
 import os
-import shutil
-from dataclasses import dataclass
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .allocator import NameAllocator
+from .archive import ARCHIVE_FORMATS, ArchiveSink
+from .dedup import DEDUP_MODES, DuplicateIndex
+from .manifest import CopyManifest
+from .metrics import ProgressReporter, SortMetrics
+from .plan import COPY, LINK, SKIP, CopyTask, SortPlan
+from .rules import RuleSet
+from .transfer import FileTransfer
+from .walker import walk_files
 
 logger = logging.getLogger(__name__)
 
+PENDING_TASKS_PER_WORKER = 4
+
 
 @dataclass
 class FileSorter:
     source: Path
     destination: Path
+    workers: int = 1
+    incremental: bool = False
+    dedup: Optional[str] = None
+    move: bool = False
+    progress_interval: float = 0.0
+    rules: RuleSet = field(default_factory=RuleSet)
+    archive: Optional[str] = None
+    metrics: SortMetrics = field(default_factory=SortMetrics, init=False, repr=False)
+    duplicates: Optional[DuplicateIndex] = field(default=None, init=False, repr=False)
+    transfer: FileTransfer = field(default_factory=FileTransfer, init=False, repr=False)
+    _names: NameAllocator = field(default_factory=NameAllocator, init=False, repr=False)
+    _manifest: Optional[CopyManifest] = field(default=None, init=False, repr=False)
+    _archives: Optional[ArchiveSink] = field(default=None, init=False, repr=False)
+    _same_device: bool = field(default=False, init=False, repr=False)
+    _vacated: Set[Path] = field(default_factory=set, init=False, repr=False)
+    _failed: Set[Path] = field(default_factory=set, init=False, repr=False)
+    _failed_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
 
     def __post_init__(self) -> None:
         self.source = self.source.expanduser().resolve()
         self.destination = self.destination.expanduser().resolve()
+        if self.workers < 1:
+            raise ValueError("Number of workers must be a positive integer.")
+        if self.dedup is not None and self.dedup not in DEDUP_MODES:
+            raise ValueError(f"Dedup mode must be one of: {', '.join(DEDUP_MODES)}.")
+        if self.archive is not None:
+            if self.archive not in ARCHIVE_FORMATS:
+                raise ValueError(
+                    f"Archive format must be one of: {', '.join(ARCHIVE_FORMATS)}."
+                )
+            if self.incremental:
+                raise ValueError("Archive output cannot be used in incremental mode.")
+            if self.dedup == "hardlink":
+                raise ValueError("Archive output supports only the 'skip' dedup mode.")
         if not self.source.exists():
             raise FileNotFoundError(f"Source directory '{self.source}' does not exist.")
         if not self.source.is_dir():
             raise NotADirectoryError(f"Source path '{self.source}' is not a directory.")
+
+    def sort(self) -> Set[Path]:
+        return self.sort_files(self.iter_files())
+
+    def sort_files(self, files: Iterable[Tuple[Path, os.stat_result]]) -> Set[Path]:
+        """Sort the given files and return the sources that failed."""
+        self._reset()
+        self.duplicates = DuplicateIndex() if self.dedup else None
         self.destination.mkdir(parents=True, exist_ok=True)
+        self._execute(self._tasks_for(files))
+        return set(self._failed)
 
-    def sort(self) -> None:
-        self._process_directory(self.source)
-
-    def _process_directory(self, directory: Path) -> None:
-        for entry in self._safe_iterdir(directory):
-            if entry.is_dir():
-                if self._is_destination_child(entry):
-                    continue
-                self._process_directory(entry)
-            elif entry.is_file():
-                self._handle_file(entry)
-
-    def _handle_file(self, file_path: Path) -> None:
-        extension = self._normalize_extension(file_path.suffix)
-        target_dir = self.destination / extension
-        target_dir.mkdir(parents=True, exist_ok=True)
-        target_file = self._resolve_target_path(file_path, target_dir)
+    def iter_files(self) -> Iterator[Tuple[Path, os.stat_result]]:
+        walker = walk_files(
+            self.source,
+            excluded=[self.destination],
+            on_error=lambda _: self.metrics.error(),
+            exclude_name=self.rules.excludes_name,
+        )
+        for entry in walker:
+            try:
+                stat = entry.stat()
+            except OSError as error:
+                logger.warning("Skipping '%s': %s", entry.path, error)
+                self.metrics.error()
+                continue
+            if not self.rules.excludes_size(stat.st_size):
+                yield Path(entry.path), stat
+
+    def plan(self) -> SortPlan:
+        """Build the full source-to-target mapping without writing anything."""
+        self._reset()
+        self.duplicates = DuplicateIndex() if self.dedup else None
+        if self.incremental:
+            self._manifest = CopyManifest(self.destination)
+            self._manifest.load()
+            self._reserve_recorded_targets(self._manifest)
         try:
-            shutil.copy2(file_path, target_file)
+            tasks = list(self._tasks_for(self.iter_files()))
+        finally:
+            self._manifest = None
+            self.metrics.finish()
+        return SortPlan(self.source, self.destination, tasks, **self._mode())
+
+    def execute(self, plan: SortPlan) -> None:
+        if plan.mode != self._mode():
+            raise ValueError(
+                f"The plan was made with {plan.mode}, not with {self._mode()}."
+            )
+        self._reset()
+        self.duplicates = DuplicateIndex()
+        copied = {task.target for task in plan.tasks if task.action == COPY}
+        for task in plan.tasks:
+            if task.original in copied:
+                self.duplicates.expect(task.original)
+        self.destination.mkdir(parents=True, exist_ok=True)
+        self._execute(self._planned_tasks(plan))
+
+    def _mode(self) -> Dict[str, Any]:
+        return {
+            "incremental": self.incremental,
+            "dedup": self.dedup,
+            "move": self.move,
+            "archive": self.archive,
+        }
+
+    def _planned_tasks(self, plan: SortPlan) -> Iterator[CopyTask]:
+        """Yield the plan's tasks, checked against the current file system.
+
+        Sources that changed since planning are skipped, and targets that
+        were taken in the meantime get a fresh name instead of being
+        overwritten. Names are claimed lazily, once the manifest is open
+        and its targets are reserved.
+        """
+        assert self.duplicates is not None
+        tasks = plan.largest_first()
+        taken: Set[Path] = set()
+        if self.archive is None:
+            # Every planned name is claimed before any is replaced, so a
+            # replacement never lands on another task's target.
+            taken = {
+                task.target
+                for task in tasks
+                if task.action != SKIP and not self._names.claim(task.target)
+            }
+        renamed: Dict[Path, Path] = {}
+        for task in tasks:
+            if not self._matches_plan(task):
+                self._fail(task.source)
+                if task.action == COPY:
+                    # Duplicates waiting for this file are copied instead.
+                    self.duplicates.release(task.target)
+                continue
+            original = renamed.get(task.original, task.original)
+            target = renamed.get(task.target, task.target)
+            if task.action != SKIP and task.target in taken:
+                taken.discard(task.target)
+                target = self._names.allocate(task.target.parent, task.target.name)
+                renamed[task.target] = target
+                self.duplicates.expect(target)
+                logger.warning(
+                    "'%s' already exists; sorting '%s' to '%s' instead.",
+                    task.target,
+                    task.source,
+                    target,
+                )
+            yield replace(task, target=target, original=original)
+
+    @staticmethod
+    def _matches_plan(task: CopyTask) -> bool:
+        try:
+            stat = task.source.stat()
         except OSError as error:
+            logger.error("Skipping '%s': %s", task.source, error)
+            return False
+        if stat.st_size != task.size or stat.st_mtime_ns != task.mtime_ns:
+            logger.error("Skipping '%s': it changed after planning.", task.source)
+            return False
+        return True
+
+    def _reset(self) -> None:
+        self._names = NameAllocator()
+        self.transfer = FileTransfer()
+        self.metrics = SortMetrics()
+
+    def _execute(self, tasks: Iterable[CopyTask]) -> None:
+        self._same_device = (
+            os.stat(self.source).st_dev == os.stat(self.destination).st_dev
+        )
+        self._vacated = set()
+        self._failed = set()
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(
+                    ProgressReporter(self.metrics, self.progress_interval)
+                )
+                if self.incremental:
+                    self._manifest = stack.enter_context(
+                        CopyManifest(self.destination)
+                    )
+                    self._reserve_recorded_targets(self._manifest)
+                if self.archive is not None:
+                    self._archives = stack.enter_context(
+                        ArchiveSink(self.destination, self.archive)
+                    )
+                self._run(tasks)
+        finally:
+            self._manifest = None
+            self._archives = None
+            if self.move:
+                self._prune_source_directories()
+            self.metrics.finish()
+
+    def _reserve_recorded_targets(self, manifest: CopyManifest) -> None:
+        # A recorded target belongs to its source even when the sorted file
+        # was deleted, so new files must not be given that name.
+        for target in manifest.targets():
+            self._names.reserve(target)
+
+    def _prune_source_directories(self) -> None:
+        # Deepest first: a parent is queued once one of its children is
+        # removed and popped only after every deeper directory was tried.
+        queued = set(self._vacated)
+        heap = [(-len(directory.parts), directory) for directory in queued]
+        heapq.heapify(heap)
+        while heap:
+            _, directory = heapq.heappop(heap)
+            if directory == self.source or self.destination.is_relative_to(directory):
+                continue
+            try:
+                directory.rmdir()
+            except OSError:
+                continue
+            logger.debug("Removed empty directory '%s'.", directory)
+            parent = directory.parent
+            if parent not in queued:
+                queued.add(parent)
+                heapq.heappush(heap, (-len(parent.parts), parent))
+
+    def _run(self, tasks: Iterable[CopyTask]) -> None:
+        if self.workers == 1:
+            for task in tasks:
+                self._process(task)
+            return
+
+        # Tasks, and therefore target names, are produced here in traversal
+        # order, so collisions get the same suffixes no matter which worker
+        # finishes first. The semaphore keeps the number of queued copies
+        # bounded.
+        slots = threading.BoundedSemaphore(self.workers * PENDING_TASKS_PER_WORKER)
+        failures: List[BaseException] = []
+
+        def finished(future: Future[None]) -> None:
+            slots.release()
+            error = future.exception()
+            if error is not None:
+                failures.append(error)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for task in tasks:
+                # An unexpected error stops the run just as it would when
+                # running sequentially.
+                if failures:
+                    break
+                slots.acquire()
+                executor.submit(self._process, task).add_done_callback(finished)
+        if failures:
+            raise failures[0]
+
+    def _process(self, task: CopyTask) -> None:
+        try:
+            self._copy_file(task)
+        except OSError as error:
+            # Errors outside the transfer itself, e.g. a file standing where
+            # the target folder should be.
             logger.error(
-                "Failed to copy '%s' to '%s': %s", file_path, target_file, error
+                "Failed to sort '%s' to '%s': %s", task.source, task.target, error
             )
+            self._fail(task.source)
+        finally:
+            # Duplicates of this file wait for it to be marked done; whatever
+            # ended the task, they must not be left waiting.
+            if self.duplicates is not None:
+                self.duplicates.release(task.target)
 
-    def _resolve_target_path(self, file_path: Path, target_dir: Path) -> Path:
-        candidate = target_dir / file_path.name
-        if not candidate.exists():
-            return candidate
+    def _fail(self, source: Path) -> None:
+        self.metrics.error()
+        with self._failed_lock:
+            self._failed.add(source)
 
-        stem, suffix = file_path.stem, file_path.suffix
-        counter = 1
-        while candidate.exists():
-            candidate = target_dir / f"{stem}_{counter}{suffix}"
-            counter += 1
-        return candidate
+    def _tasks_for(
+        self, files: Iterable[Tuple[Path, os.stat_result]]
+    ) -> Iterator[CopyTask]:
+        for file_path, stat in files:
+            self.metrics.scanned()
+            task = self._task_for(file_path, stat)
+            if task is not None:
+                yield task
 
-    def _safe_iterdir(self, directory: Path) -> Iterable[Path]:
-        try:
-            return list(directory.iterdir())
-        except (PermissionError, FileNotFoundError) as error:
-            logger.warning("Skipping '%s': %s", directory, error)
-            return []
+    def _task_for(self, file_path: Path, stat: os.stat_result) -> CopyTask | None:
+        target_file = None
+        # A moved source is gone, so a file that later appears at the same
+        # path is a new one; the recorded copy is the only copy of the old
+        # file and must not be replaced.
+        if self._manifest is not None and not self.move:
+            record = self._manifest.lookup(file_path)
+            if record is not None:
+                target_file = self._manifest.target_of(record)
+                if record.matches(stat.st_size, stat.st_mtime_ns) and (
+                    target_file.exists()
+                ):
+                    if self.duplicates is not None:
+                        self.duplicates.add(
+                            file_path, stat.st_size, target_file, copied=True
+                        )
+                    self.metrics.skipped()
+                    return None
+                if self._manifest.is_shared(record):
+                    # The target also stands for other sources deduplicated
+                    # onto it; writing this file's new content there would
+                    # corrupt them, so the file gets a name of its own.
+                    target_file = None
+
+        original = None
+        if self.duplicates is not None:
+            original = self.duplicates.find(file_path, stat.st_size)
+        if original is not None and self.dedup == "skip":
+            return CopyTask(
+                file_path, original, stat.st_size, stat.st_mtime_ns, SKIP, original
+            )
+
+        if target_file is not None and not self._names.claim(target_file):
+            # Should the recorded name be taken after all, the file is sorted
+            # like a new one rather than overwriting the other file.
+            target_file = None
+        if target_file is None:
+            folder = self.rules.classify(file_path.name, stat.st_size, file_path)
+            target_dir = self.destination / folder
+            if self.archive is not None:
+                # Inside an archive the relative source path is already unique.
+                target_file = target_dir / file_path.relative_to(self.source)
+            else:
+                target_file = self._names.allocate(target_dir, file_path.name)
+
+        if original is not None:
+            return CopyTask(
+                file_path, target_file, stat.st_size, stat.st_mtime_ns, LINK, original
+            )
+        if self.duplicates is not None:
+            self.duplicates.add(file_path, stat.st_size, target_file)
+        return CopyTask(file_path, target_file, stat.st_size, stat.st_mtime_ns)
+
+    def _copy_file(self, task: CopyTask) -> None:
+        if task.action != SKIP and self._archives is None:
+            self._names.ensure_directory(task.target.parent)
+        if task.original is not None:
+            self._handle_duplicate(task, task.original)
+            return
+
+        copied = self._transfer(task)
+        if self.duplicates is not None:
+            self.duplicates.mark_done(task.target, copied)
+        if copied:
+            self._record(task)
+
+    def _handle_duplicate(self, task: CopyTask, original: Path) -> None:
+        assert self.duplicates is not None
+        # The original is copied by an earlier task; if that copy failed, this
+        # file takes its place as a regular copy.
+        if not self.duplicates.wait_for(original):
+            self._copy_file(
+                CopyTask(task.source, task.target, task.size, task.mtime_ns)
+            )
+            return
+
+        if task.action == LINK and not self._link(original, task.target):
+            if self._transfer(task):
+                self._record(task)
+            return
 
-    def _is_destination_child(self, entry: Path) -> bool:
+        self.duplicates.record_saving(task.size)
+        self._record(task)
+        if self.move:
+            self._release_source(task.source)
+
+    def _release_source(self, source: Path) -> None:
         try:
-            return entry.resolve().is_relative_to(self.destination)
-        except AttributeError:
-            dest = str(self.destination)
-            resolved_entry = str(entry.resolve())
-            prefix = dest + os.sep
-            return resolved_entry == dest or resolved_entry.startswith(prefix)
+            source.unlink()
+        except OSError as error:
+            logger.error("Failed to remove '%s': %s", source, error)
+            self.metrics.error()
+            return
+        self._vacated.add(source.parent)
+
+    def _record(self, task: CopyTask) -> None:
+        if self._manifest is not None:
+            self._manifest.record(task.source, task.size, task.mtime_ns, task.target)
 
     @staticmethod
-    def _normalize_extension(suffix: str) -> str:
-        clean_suffix = suffix.lower().lstrip(".")
-        return clean_suffix if clean_suffix else "unknown"
+    def _link(original: Path, target: Path) -> bool:
+        try:
+            if target.exists():
+                target.unlink()
+            os.link(original, target)
+        except OSError as error:
+            logger.debug("Cannot hardlink '%s' to '%s': %s", target, original, error)
+            return False
+        return True
+
+    def _folder_of(self, target: Path) -> str:
+        return target.relative_to(self.destination).parts[0]
+
+    def _add_to_archive(self, archives: ArchiveSink, task: CopyTask) -> None:
+        relative = task.target.relative_to(self.destination)
+        name = relative.relative_to(relative.parts[0]).as_posix()
+        archives.add(relative.parts[0], task.source, name, task.size)
+        if self.move:
+            task.source.unlink()
+            self._vacated.add(task.source.parent)
+
+    def _transfer(self, task: CopyTask) -> bool:
+        try:
+            if self._archives is not None:
+                self._add_to_archive(self._archives, task)
+            elif self.move:
+                self.transfer.move(
+                    task.source, task.target, task.size, rename=self._same_device
+                )
+                self._vacated.add(task.source.parent)
+            else:
+                self.transfer.copy(task.source, task.target)
+        except OSError as error:
+            logger.error(
+                "Failed to %s '%s' to '%s': %s",
+                "move" if self.move else "copy",
+                task.source,
+                task.target,
+                error,
+            )
+            self._fail(task.source)
+            return False
+        self.metrics.copied(self._folder_of(task.target), task.size)
+        return True
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import errno
+import logging
+import os
+import shutil
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 1 << 20
+PARTIAL_SUFFIX = ".part"
+FICLONE = 0x40049409
+
+# Errors meaning "this strategy does not work for these files", as opposed
+# to real I/O failures that must reach the caller.
+UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTTY,
+    errno.EBADF,
+    errno.EOPNOTSUPP,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+}
+
+Strategy = Callable[[int, int, int], None]
+
+
+def _reflink(source_fd: int, target_fd: int, size: int) -> None:
+    fcntl.ioctl(target_fd, FICLONE, source_fd)
+
+
+def _short_transfer(name: str, offset: int, size: int) -> OSError:
+    if offset == 0:
+        # Some filesystems answer with zero bytes instead of an error when
+        # they cannot do the transfer; the next strategy is tried instead.
+        return OSError(errno.EOPNOTSUPP, f"{name} transferred no data")
+    return OSError(errno.EIO, f"{name} stopped after {offset} of {size} bytes")
+
+
+def _copy_file_range(source_fd: int, target_fd: int, size: int) -> None:
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(
+            source_fd, target_fd, size - offset, offset, offset
+        )
+        if copied == 0:
+            raise _short_transfer("copy_file_range", offset, size)
+        offset += copied
+
+
+def _sendfile(source_fd: int, target_fd: int, size: int) -> None:
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(target_fd, source_fd, offset, size - offset)
+        if sent == 0:
+            raise _short_transfer("sendfile", offset, size)
+        offset += sent
+
+
+def _buffered(source_fd: int, target_fd: int, size: int) -> None:
+    os.lseek(source_fd, 0, os.SEEK_SET)
+    while True:
+        chunk = os.read(source_fd, BUFFER_SIZE)
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(target_fd, view) :]
+
+
+def available_strategies() -> List[Tuple[str, Strategy]]:
+    strategies: List[Tuple[str, Strategy]] = []
+    if fcntl is not None and sys.platform.startswith("linux"):
+        strategies.append(("reflink", _reflink))
+    if hasattr(os, "copy_file_range"):
+        strategies.append(("copy_file_range", _copy_file_range))
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        strategies.append(("sendfile", _sendfile))
+    strategies.append(("buffered", _buffered))
+    return strategies
+
+
+def partial_path(target: Path) -> Path:
+    return target.with_name(f".{target.name}{PARTIAL_SUFFIX}")
+
+
+class FileTransfer:
+    """Copies files with the fastest strategy the filesystems allow.
+
+    Strategies are tried in order: reflink clone, ``copy_file_range``,
+    ``sendfile`` and finally a buffered read/write loop. A strategy that
+    reports itself unsupported is not retried for the same pair of devices.
+    ``move`` renames within a filesystem and copies plus unlinks across them.
+    """
+
+    def __init__(self) -> None:
+        self._strategies = available_strategies()
+        self._unsupported: Set[Tuple[str, int, int]] = set()
+        self._lock = threading.Lock()
+        self.files: Counter[str] = Counter()
+        self.bytes: Counter[str] = Counter()
+
+    def copy(self, source: Path, target: Path) -> str:
+        # Data goes to a hidden file next to the target that is renamed into
+        # place when complete, so an interrupted copy never leaves a partial
+        # file under the real name, and replacing a hardlinked target never
+        # writes through to the other names of its inode.
+        partial = partial_path(target)
+        try:
+            with open(source, "rb", buffering=0) as src, open(
+                partial, "wb", buffering=0
+            ) as dst:
+                source_fd, target_fd = src.fileno(), dst.fileno()
+                stat = os.fstat(source_fd)
+                devices = (stat.st_dev, os.fstat(target_fd).st_dev)
+                used = self._copy_data(source_fd, target_fd, stat.st_size, devices)
+            shutil.copystat(source, partial)
+            os.replace(partial, target)
+        except BaseException:
+            try:
+                os.unlink(partial)
+            except OSError:
+                pass
+            raise
+        self._count(used, stat.st_size)
+        return used
+
+    def move(self, source: Path, target: Path, size: int, rename: bool = True) -> str:
+        if rename:
+            try:
+                os.replace(source, target)
+            except OSError as error:
+                if error.errno != errno.EXDEV:
+                    raise
+            else:
+                self._count("rename", size)
+                return "rename"
+
+        used = self.copy(source, target)
+        os.unlink(source)
+        return used
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                name: {"files": self.files[name], "bytes": self.bytes[name]}
+                for name in self.files
+            }
+
+    def _count(self, strategy: str, size: int) -> None:
+        with self._lock:
+            self.files[strategy] += 1
+            self.bytes[strategy] += size
+
+    def _copy_data(
+        self, source_fd: int, target_fd: int, size: int, devices: Tuple[int, int]
+    ) -> str:
+        if size == 0:
+            return "empty"
+
+        for name, strategy in self._strategies:
+            key = (name, *devices)
+            if name != "buffered" and key in self._unsupported:
+                continue
+            try:
+                strategy(source_fd, target_fd, size)
+            except OSError as error:
+                if name == "buffered" or error.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+                logger.debug("%s is not supported here: %s", name, error)
+                with self._lock:
+                    self._unsupported.add(key)
+                os.ftruncate(target_fd, 0)
+                os.lseek(target_fd, 0, os.SEEK_SET)
+                continue
+            return name
+        raise AssertionError("The buffered strategy always applies.")
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DirectoryKey = Tuple[int, int]
+
+
+def directory_key(path: Path) -> DirectoryKey | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def walk_files(
+    root: Path,
+    excluded: Iterable[Path] = (),
+    on_error: Optional[Callable[[OSError], None]] = None,
+    exclude_name: Optional[Callable[[str, bool], bool]] = None,
+) -> Iterator[os.DirEntry[str]]:
+    """Yield file entries below ``root`` depth-first without recursion.
+
+    Only one directory handle is open at a time and the pending directories
+    live on an explicit stack, so deep trees never hit the recursion limit.
+    Excluded directories are matched by ``(st_dev, st_ino)``; the inode from
+    ``readdir`` filters candidates so only real matches cost a ``stat`` call.
+    ``exclude_name`` drops entries by name before anything is stat-ed.
+    """
+    excluded_keys: Set[DirectoryKey] = {
+        key for key in map(directory_key, excluded) if key is not None
+    }
+    excluded_inodes = {inode for _, inode in excluded_keys}
+    followed_links: Set[DirectoryKey] = set()
+    root_key = directory_key(root)
+    if root_key is not None:
+        followed_links.add(root_key)
+    stack = [os.fspath(root)]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            scanner = os.scandir(directory)
+        except OSError as error:
+            logger.warning("Skipping '%s': %s", directory, error)
+            if on_error is not None:
+                on_error(error)
+            continue
+
+        with scanner:
+            for entry in scanner:
+                try:
+                    if entry.is_dir():
+                        if exclude_name is not None and exclude_name(entry.name, True):
+                            continue
+                        if _should_descend(
+                            entry, excluded_keys, excluded_inodes, followed_links
+                        ):
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        if exclude_name is not None and exclude_name(entry.name, False):
+                            continue
+                        yield entry
+                except OSError as error:
+                    logger.warning("Skipping '%s': %s", entry.path, error)
+                    if on_error is not None:
+                        on_error(error)
+
+
+def _should_descend(
+    entry: os.DirEntry[str],
+    excluded_keys: Set[DirectoryKey],
+    excluded_inodes: Set[int],
+    followed_links: Set[DirectoryKey],
+) -> bool:
+    if entry.is_symlink():
+        stat = entry.stat()
+        key = (stat.st_dev, stat.st_ino)
+        if key in excluded_keys or key in followed_links:
+            return False
+        followed_links.add(key)
+        return True
+
+    if entry.inode() not in excluded_inodes:
+        return True
+    stat = entry.stat(follow_symlinks=False)
+    return (stat.st_dev, stat.st_ino) not in excluded_keys
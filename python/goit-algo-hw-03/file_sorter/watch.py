@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .sorter import FileSorter
+
+logger = logging.getLogger(__name__)
+
+# Relative source path -> (size, mtime_ns).
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+class SourceWatcher:
+    """Keeps a source tree sorted by re-scanning it on an interval.
+
+    Each scan compares the tree against an in-memory snapshot and hands only
+    new or changed files to the sorter, so the copy cost of a cycle is
+    proportional to the changes rather than to the size of the tree.
+    """
+
+    def __init__(self, sorter: FileSorter, interval: float) -> None:
+        if interval <= 0:
+            raise ValueError("Watch interval must be greater than zero.")
+        self.sorter = sorter
+        self.interval = interval
+        self.snapshot: Snapshot = {}
+        self._prefix = len(os.fspath(sorter.source)) + 1
+
+    def poll(self) -> int:
+        current: Snapshot = {}
+        changed: List[Tuple[Path, os.stat_result]] = []
+        for path, stat in self.sorter.iter_files():
+            key = os.fspath(path)[self._prefix :]
+            state = (stat.st_size, stat.st_mtime_ns)
+            current[key] = state
+            if self.snapshot.get(key) != state:
+                changed.append((path, stat))
+        if changed:
+            # Failed files stay out of the snapshot so the next poll retries
+            # them even if they do not change in the meantime.
+            for path in self.sorter.sort_files(changed):
+                current.pop(os.fspath(path)[self._prefix :], None)
+            logger.info(
+                "%d new or changed files, %d transferred (%d tracked).",
+                len(changed),
+                self.sorter.metrics.files_copied,
+                len(current),
+            )
+        self.snapshot = current
+        return len(changed)
+
+    def run(
+        self, stop: Optional[threading.Event] = None, cycles: Optional[int] = None
+    ) -> None:
+        stop = stop or threading.Event()
+        completed = 0
+        while True:
+            self.poll()
+            completed += 1
+            if cycles is not None and completed >= cycles:
+                return
+            if stop.wait(self.interval):
+                return
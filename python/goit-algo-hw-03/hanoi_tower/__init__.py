@@ -1,3 +1,4 @@
-from .solver import HanoiSolver
+from .multipeg import MultiPegSolver
+from .solver import HanoiSolver, Move
 
-__all__ = ["HanoiSolver"]
+__all__ = ["HanoiSolver", "Move", "MultiPegSolver"]
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 import argparse
-from typing import Dict, List
+import string
+import sys
+from typing import Dict, List, Sequence, Set, TextIO
 
 try:
+    from .multipeg import MultiPegSolver
     from .solver import HanoiSolver
 except ImportError:  # pragma: no cover - fallback when run as a script
+    from multipeg import MultiPegSolver
     from solver import HanoiSolver
 
+OUTPUT_BUFFER_SIZE = 1 << 16
+
 
 def positive_int(value: str) -> int:
     parsed = int(value)
@@ -16,6 +22,22 @@ def positive_int(value: str) -> int:
     return parsed
 
 
+def peg_count(value: str) -> int:
+    parsed = int(value)
+    if not 3 <= parsed <= len(string.ascii_uppercase):
+        raise argparse.ArgumentTypeError(
+            f"Number of pegs must be between 3 and {len(string.ascii_uppercase)}."
+        )
+    return parsed
+
+
+def render_interval(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("Render interval must be greater than zero.")
+    return parsed
+
+
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Solve the Tower of Hanoi puzzle and display each step."
@@ -25,48 +47,112 @@ def parse_arguments() -> argparse.Namespace:
         type=positive_int,
         help="Number of disks on the starting peg.",
     )
+    parser.add_argument(
+        "--pegs",
+        type=peg_count,
+        default=3,
+        help="Number of pegs; more than 3 uses the Frame-Stewart solver.",
+    )
+    parser.add_argument(
+        "--every",
+        type=render_interval,
+        default=1,
+        help="Print only every N-th move, plus the initial and final states.",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Print only the move count without generating the moves.",
+    )
     return parser.parse_args()
 
 
-def render_state(state: Dict[str, List[int]], disk_count: int) -> str:
-    pegs = ("A", "B", "C")
-    max_width = disk_count * 2 - 1
-
-    def disk_at_level(disks: List[int], level: int) -> int | None:
-        index = len(disks) - level - 1
-        if index < 0:
-            return None
-        return disks[index]
-
-    def draw_disk(size: int | None) -> str:
-        if size is None:
-            return "|".center(max_width)
-        symbol_count = size * 2 - 1
-        return ("=" * symbol_count).center(max_width)
-
-    lines: List[str] = []
-    for level in range(disk_count):
-        row = "   ".join(
-            draw_disk(disk_at_level(state.get(peg, []), level)) for peg in pegs
+class TowerRenderer:
+    """Draws peg states from precomputed glyphs, one cached column per peg.
+
+    After a move only the source and target columns are rebuilt; every
+    other peg reuses its column from the previous frame.
+    """
+
+    def __init__(self, pegs: Sequence[str], disk_count: int) -> None:
+        max_width = disk_count * 2 - 1
+        self.pegs = tuple(pegs)
+        self.disk_count = disk_count
+        self._glyphs = ["|".center(max_width)] + [
+            ("=" * (size * 2 - 1)).center(max_width)
+            for size in range(1, disk_count + 1)
+        ]
+        self._footer = (
+            "   ".join("-" * max_width for _ in self.pegs)
+            + "\n"
+            + "   ".join(peg.center(max_width) for peg in self.pegs)
         )
-        lines.append(row)
+        self._columns: Dict[str, List[str]] = {}
+        self._dirty: Set[str] = set(self.pegs)
+
+    def moved(self, source: str, target: str) -> None:
+        self._dirty.add(source)
+        self._dirty.add(target)
+
+    def render(self, state: Dict[str, List[int]]) -> str:
+        glyphs = self._glyphs
+        for peg in self._dirty:
+            # Stacks are drawn top-aligned: row 0 shows the top disk.
+            disks = state.get(peg, [])
+            column = [glyphs[disk] for disk in reversed(disks)]
+            column += [glyphs[0]] * (self.disk_count - len(disks))
+            self._columns[peg] = column
+        self._dirty.clear()
+        rows = zip(*(self._columns[peg] for peg in self.pegs))
+        return "\n".join(["   ".join(row) for row in rows] + [self._footer])
 
-    base = "-" * max_width
-    lines.append("   ".join(base for _ in pegs))
-    lines.append("   ".join(peg.center(max_width) for peg in pegs))
-    return "\n".join(lines)
+
+def render_state(state: Dict[str, List[int]], disk_count: int) -> str:
+    return TowerRenderer(tuple(state), disk_count).render(state)
+
+
+def run(disks: int, pegs: int, every: int, quiet: bool, output: TextIO) -> None:
+    names = tuple(string.ascii_uppercase[:pegs])
+    solver = (
+        HanoiSolver(disk_count=disks)
+        if pegs == 3
+        else MultiPegSolver(disk_count=disks, pegs=names)
+    )
+    if quiet:
+        output.write(f"{disks} disks on {pegs} pegs: {solver.move_count} moves\n")
+        return
+
+    # Moves are rendered as they are generated; nothing is kept between them,
+    # and with --every the skipped moves only mark their pegs as changed.
+    state: Dict[str, List[int]] = {peg: [] for peg in names}
+    state[names[0]] = list(range(disks, 0, -1))
+    renderer = TowerRenderer(names, disks)
+    write = output.write
+    write(f"Initial state\n{renderer.render(state)}\n")
+    count = 0
+    for count, (move, state) in enumerate(solver.iter_states(), start=1):
+        renderer.moved(move.source, move.target)
+        if count % every:
+            continue
+        label = move.action if every == 1 else f"[{count}] {move.action}"
+        write(f"\n{label}\n{renderer.render(state)}\n")
+    write(f"\nFinal state\n{renderer.render(state)}\n")
+    if every > 1:
+        write(f"Total moves: {count}\n")
 
 
 def main() -> None:
     args = parse_arguments()
-    solver = HanoiSolver(disk_count=args.disks)
-    history = solver.solve()
-
-    for index, log in enumerate(history):
-        print(log.action)
-        print(render_state(log.state, solver.disk_count))
-        if index != len(history) - 1:
-            print()
+    # All output goes through one large buffer instead of a print per line.
+    output = open(
+        sys.stdout.fileno(),
+        "w",
+        buffering=OUTPUT_BUFFER_SIZE,
+        encoding=sys.stdout.encoding,
+        closefd=False,
+    )
+    with output:
+        run(args.disks, args.pegs, args.every, args.quiet, output)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+
+from .solver import Move
+
+
+class FrameStewartTable:
+    """Optimal move counts and splits for k-peg towers, filled on demand.
+
+    ``moves(n, p)`` is the Frame–Stewart number: move the top ``t`` disks
+    aside with all ``p`` pegs, the other ``n - t`` with ``p - 1`` pegs, then
+    the ``t`` disks back on top. The cost is convex in ``t`` and the best
+    split never decreases with ``n``, so each new row entry is found by
+    advancing from the previous split instead of trying every ``t``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        # pegs -> (moves by disk count, best split by disk count)
+        self._rows: Dict[int, Tuple[List[int], List[int]]] = {}
+
+    def moves(self, disks: int, pegs: int) -> int:
+        if pegs == 3:
+            return 2**disks - 1
+        return self._row(disks, pegs)[0][disks]
+
+    def split(self, disks: int, pegs: int) -> int:
+        if pegs == 3:
+            return disks - 1
+        return self._row(disks, pegs)[1][disks]
+
+    def _row(self, disks: int, pegs: int) -> Tuple[List[int], List[int]]:
+        with self._lock:
+            row = self._rows.setdefault(pegs, ([0, 1], [0, 0]))
+            moves, splits = row
+            # Rows are extended bottom-up, so no recursion over disks is needed
+            # even for thousands of them; only the missing tail is computed.
+            for count in range(len(moves), disks + 1):
+                best = splits[-1] or 1
+                cost = 2 * moves[best] + self.moves(count - best, pegs - 1)
+                while best + 1 < count:
+                    candidate = 2 * moves[best + 1] + self.moves(
+                        count - best - 1, pegs - 1
+                    )
+                    if candidate >= cost:
+                        break
+                    best, cost = best + 1, candidate
+                moves.append(cost)
+                splits.append(best)
+            return row
+
+
+SPLITS = FrameStewartTable()
+
+
+@dataclass
+class MultiPegSolver:
+    """Frame–Stewart solver for the Tower of Hanoi with three or more pegs.
+
+    Disks start on the first peg and end on the last one. Split decisions
+    come from the module-wide ``SPLITS`` table, which is shared by every
+    solver, so repeated queries for large disk counts cost a list lookup.
+    """
+
+    disk_count: int
+    pegs: Tuple[str, ...] = ("A", "B", "C", "D")
+
+    def __post_init__(self) -> None:
+        if self.disk_count <= 0:
+            raise ValueError("Disk count must be a positive integer.")
+        self.pegs = tuple(self.pegs)
+        if len(self.pegs) < 3 or len(set(self.pegs)) != len(self.pegs):
+            raise ValueError("At least three distinct pegs are required.")
+
+    @property
+    def source(self) -> str:
+        return self.pegs[0]
+
+    @property
+    def target(self) -> str:
+        return self.pegs[-1]
+
+    @property
+    def move_count(self) -> int:
+        return SPLITS.moves(self.disk_count, len(self.pegs))
+
+    def iter_moves(self) -> Iterator[Move]:
+        # Each frame is (disks, disks above them, source, target, free pegs);
+        # the stack never holds more than three frames per recursion level.
+        stack: List[Tuple[int, int, str, str, Tuple[str, ...]]] = [
+            (self.disk_count, 0, self.source, self.target, self.pegs[1:-1])
+        ]
+        while stack:
+            disks, above, source, target, free = stack.pop()
+            if disks == 1:
+                yield Move(above + 1, source, target)
+                continue
+            top = SPLITS.split(disks, len(free) + 2)
+            parking, rest = free[0], free[1:]
+            stack.append((top, above, parking, target, rest + (source,)))
+            stack.append((disks - top, above + top, source, target, rest))
+            stack.append((top, above, source, parking, rest + (target,)))
+
+    def iter_states(self) -> Iterator[Tuple[Move, Dict[str, List[int]]]]:
+        """Yield every move with the live peg state right after it."""
+        state: Dict[str, List[int]] = {peg: [] for peg in self.pegs}
+        state[self.source] = list(range(self.disk_count, 0, -1))
+        for move in self.iter_moves():
+            state[move.target].append(state[move.source].pop())
+            yield move, state
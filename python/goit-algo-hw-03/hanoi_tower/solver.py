@@ -1,7 +1,68 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Sequence, Tuple
+
+
+class Move(NamedTuple):
+    disk: int
+    source: str
+    target: str
+
+    @property
+    def action(self) -> str:
+        return f"Move disk from {self.source} to {self.target}: {self.disk}"
+
+
+class PackedMoves(Sequence[Move]):
+    """A full move sequence stored as one 4-bit code per move.
+
+    A code is ``source_index * 3 + target_index`` over the solver's pegs;
+    the disk of move ``k`` is recovered from ``k`` itself, so 2**25 moves
+    take 16 MiB instead of hundreds of megabytes of tuples.
+    """
+
+    def __init__(self, pegs: Tuple[str, str, str], count: int, data: bytes) -> None:
+        self.pegs = pegs
+        self.data = data
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Move index out of range.")
+        code = (self.data[index >> 1] >> ((index & 1) << 2)) & 0xF
+        source, target = divmod(code, 3)
+        k = index + 1
+        return Move((k & -k).bit_length(), self.pegs[source], self.pegs[target])
+
+
+def _peg_cycle(
+    count: int, source: str, target: str, auxiliary: str
+) -> Tuple[str, str, str]:
+    if count % 2:
+        return source, auxiliary, target
+    return source, target, auxiliary
+
+
+def _tower_moves(
+    count: int, source: str, target: str, auxiliary: str
+) -> Iterator[Move]:
+    # Move k (1-based) moves disk ctz(k) + 1 between pegs given by k's
+    # bits, so every move is O(1) and no recursion or history is kept.
+    pegs = _peg_cycle(count, source, target, auxiliary)
+    for k in range(1, 2**count):
+        yield Move(
+            (k & -k).bit_length(),
+            pegs[(k & (k - 1)) % 3],
+            pegs[((k | (k - 1)) + 1) % 3],
+        )
 
 
 @dataclass(frozen=True)
@@ -38,6 +99,141 @@ class HanoiSolver:
         self.history.append(MoveLog("Final state", self._snapshot()))
         return list(self.history)
 
+    def iter_moves(self) -> Iterator[Move]:
+        return _tower_moves(
+            self.disk_count, self.source, self.target, self.auxiliary
+        )
+
+    @property
+    def move_count(self) -> int:
+        return 2**self.disk_count - 1
+
+    def move_at(self, k: int) -> Move:
+        """Return the k-th move (1-based) without generating the earlier ones."""
+        if not 1 <= k <= self.move_count:
+            raise ValueError(f"Move number must be between 1 and {self.move_count}.")
+        pegs = self._peg_cycle()
+        return Move(
+            (k & -k).bit_length(),
+            pegs[(k & (k - 1)) % 3],
+            pegs[((k | (k - 1)) + 1) % 3],
+        )
+
+    def state_after(self, k: int) -> Dict[str, List[int]]:
+        """Return the peg configuration after k moves in O(n).
+
+        Walking from the largest disk down, the first 2**(d-1) moves of a
+        d-disk transfer leave disk d on its source peg and the rest leave it
+        on its target, so each disk's peg follows from one bit of k.
+        """
+        if not 0 <= k <= self.move_count:
+            raise ValueError(f"Move count must be between 0 and {self.move_count}.")
+        state: Dict[str, List[int]] = {
+            self.source: [],
+            self.auxiliary: [],
+            self.target: [],
+        }
+        source, target, auxiliary = self.source, self.target, self.auxiliary
+        for disk in range(self.disk_count, 0, -1):
+            half = 1 << (disk - 1)
+            if k < half:
+                state[source].append(disk)
+                target, auxiliary = auxiliary, target
+            else:
+                state[target].append(disk)
+                k -= half
+                source, auxiliary = auxiliary, source
+        return state
+
+    def packed_moves(self) -> PackedMoves:
+        pegs = (self.source, self.auxiliary, self.target)
+        positions = [pegs.index(peg) for peg in self._peg_cycle()]
+        data = bytearray((self.move_count + 1) // 2)
+        for k in range(1, self.move_count + 1):
+            code = (
+                positions[(k & (k - 1)) % 3] * 3
+                + positions[((k | (k - 1)) + 1) % 3]
+            )
+            data[(k - 1) >> 1] |= code << (((k - 1) & 1) << 2)
+        return PackedMoves(pegs, self.move_count, bytes(data))
+
+    def moves_from(self, state: Mapping[str, Sequence[int]]) -> int:
+        """Return the optimal number of moves from ``state`` to the target."""
+        return sum(2 ** (disk - 1) for disk, _, _, _ in self._steps_from(state))
+
+    def iter_moves_from(self, state: Mapping[str, Sequence[int]]) -> Iterator[Move]:
+        """Yield the optimal moves from any legal configuration to the target.
+
+        Works for a state saved mid-run too, e.g. ``state_after(k)``, in which
+        case the moves are exactly the remainder of ``iter_moves()``.
+        """
+        steps = self._steps_from(state)
+        for disk, source, target, parked in reversed(steps):
+            yield Move(disk, source, target)
+            yield from _tower_moves(
+                disk - 1, parked, target, self._third(parked, target)
+            )
+
+    def _steps_from(
+        self, state: Mapping[str, Sequence[int]]
+    ) -> List[Tuple[int, str, str, str]]:
+        # From the largest disk down: a disk already where it must go stays
+        # there; any other disk has to be moved once, which first requires
+        # every smaller disk gathered on the third peg. Each such disk costs
+        # one move plus 2**(d-1) - 1 to restack the smaller disks on top.
+        positions = self._positions(state)
+        steps: List[Tuple[int, str, str, str]] = []
+        wanted = self.target
+        for disk in range(self.disk_count, 0, -1):
+            current = positions[disk]
+            if current != wanted:
+                parked = self._third(current, wanted)
+                steps.append((disk, current, wanted, parked))
+                wanted = parked
+        return steps
+
+    def _positions(self, state: Mapping[str, Sequence[int]]) -> List[str]:
+        pegs = (self.source, self.auxiliary, self.target)
+        unknown = set(state) - set(pegs)
+        if unknown:
+            raise ValueError(f"Unknown pegs in state: {', '.join(sorted(unknown))}.")
+        positions = [""] * (self.disk_count + 1)
+        for peg, disks in state.items():
+            for lower, upper in zip(disks, disks[1:]):
+                if upper >= lower:
+                    raise ValueError(f"Larger disk on top of a smaller one on {peg}.")
+            for disk in disks:
+                if not 1 <= disk <= self.disk_count or positions[disk]:
+                    raise ValueError(f"Invalid or repeated disk {disk} on {peg}.")
+                positions[disk] = peg
+        if not all(positions[1:]):
+            raise ValueError(f"State must hold all {self.disk_count} disks.")
+        return positions
+
+    def _third(self, first: str, second: str) -> str:
+        for peg in (self.source, self.auxiliary, self.target):
+            if peg != first and peg != second:
+                return peg
+        raise ValueError("Pegs must be distinct.")
+
+    def iter_states(self) -> Iterator[Tuple[Move, Dict[str, List[int]]]]:
+        """Yield every move with the peg state right after it.
+
+        The state dict is one live object updated in place, which keeps memory
+        constant; copy it if it has to outlive the next iteration.
+        """
+        state: Dict[str, List[int]] = {
+            self.source: list(range(self.disk_count, 0, -1)),
+            self.auxiliary: [],
+            self.target: [],
+        }
+        for move in self.iter_moves():
+            state[move.target].append(state[move.source].pop())
+            yield move, state
+
+    def _peg_cycle(self) -> Tuple[str, str, str]:
+        return _peg_cycle(self.disk_count, self.source, self.target, self.auxiliary)
+
     def _move(self, n: int, source: str, target: str, auxiliary: str) -> None:
         if n == 0:
             return
@@ -53,7 +249,7 @@ class HanoiSolver:
         if self._state[target] and self._state[target][-1] < disk:
             raise ValueError("Cannot place a larger disk on top of a smaller disk.")
         self._state[target].append(disk)
-        action = f"Move disk from {source} to {target}: {disk}"
+        action = Move(disk, source, target).action
         self.history.append(MoveLog(action, self._snapshot()))
 
     def _snapshot(self) -> Dict[str, List[int]]:
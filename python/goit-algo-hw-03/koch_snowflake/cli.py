@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import importlib.util
+from pathlib import Path
 
 from .fractal import KochSnowflakeDrawer
+from .stream import write_stream
 
 
 def positive_int(value: str) -> int:
@@ -19,6 +22,22 @@ def positive_float(value: str) -> float:
     return parsed
 
 
+def refresh_interval(value: str) -> int:
+    parsed = int(value)
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("Refresh interval must be > 0.")
+    return parsed
+
+
+def output_file(value: str) -> Path:
+    path = Path(value)
+    if path.suffix.lower() not in {".svg", ".png", ".txt"}:
+        raise argparse.ArgumentTypeError(
+            "Output file must end with .svg, .png or .txt."
+        )
+    return path
+
+
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Visualize the Koch snowflake for the requested recursion order."
@@ -35,12 +54,62 @@ def parse_arguments() -> argparse.Namespace:
         default=300.0,
         help="Edge length of the base triangle (default: 300).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--output",
+        type=output_file,
+        default=None,
+        help="Write an .svg or .png file with the NumPy engine instead of turtle.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream --output (.svg or .txt) vertex by vertex in constant memory.",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Draw precomputed vertices with tracing off; Up/Down change the order.",
+    )
+    parser.add_argument(
+        "--refresh-every",
+        dest="refresh_every",
+        type=refresh_interval,
+        default=1000,
+        help="Segments drawn between screen refreshes in --fast mode (default: 1000).",
+    )
+    args = parser.parse_args()
+    suffix = args.output.suffix.lower() if args.output is not None else None
+    if args.stream and suffix not in {".svg", ".txt"}:
+        parser.error("--stream requires an --output file ending with .svg or .txt.")
+    if not args.stream and suffix == ".txt":
+        parser.error("Plain-text .txt output is only available with --stream.")
+    if not args.stream and suffix is not None:
+        # Check optional dependencies up front so a missing one is reported
+        # as a usage error rather than a traceback after the work is done.
+        required = ["numpy"] + (["matplotlib"] if suffix == ".png" else [])
+        missing = [name for name in required if importlib.util.find_spec(name) is None]
+        if missing:
+            parser.error(
+                f"{suffix} output requires {' and '.join(missing)}; install it or "
+                "use --stream with an .svg or .txt file."
+            )
+    return args
 
 
 def main() -> None:
     args = parse_arguments()
-    drawer = KochSnowflakeDrawer(line_length=args.length)
+    if args.stream:
+        write_stream(args.order, args.length, args.output)
+        return
+    if args.output is not None:
+        # Imported here so the turtle mode keeps working without NumPy.
+        from .points import export, snowflake_vertices
+
+        export(snowflake_vertices(args.order, args.length), args.output)
+        return
+    drawer = KochSnowflakeDrawer(
+        line_length=args.length, fast=args.fast, refresh_every=args.refresh_every
+    )
     drawer.draw(order=args.order)
 
 
@@ -2,6 +2,17 @@ from __future__ import annotations
 
 import turtle
 from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Tuple
+
+from .stream import iter_points
+
+Point = Tuple[float, float]
+
+
+@lru_cache(maxsize=16)
+def cached_vertices(order: int, length: float) -> Tuple[Point, ...]:
+    return tuple(iter_points(order, length))
 
 
 @dataclass
@@ -11,10 +22,18 @@ class KochSnowflakeDrawer:
     background_color: str = "#f7fbff"
     pen_size: int = 2
     animation_speed: int = 0
+    fast: bool = False
+    refresh_every: int = 1000
+    # Highest order the Up key reaches; each order has four times the vertices
+    # of the previous one and every visited order stays cached.
+    max_fast_order: int = 7
     _screen: "turtle.TurtleScreen" = field(init=False, repr=False)
     _turtle: "turtle.Turtle" = field(init=False, repr=False)
+    _order: int = field(init=False, default=0, repr=False)
 
     def __post_init__(self) -> None:
+        if self.refresh_every <= 0:
+            raise ValueError("Refresh interval must be a positive integer.")
         self._screen = turtle.Screen()
         self._screen.bgcolor(self.background_color)
         self._turtle = turtle.Turtle()
@@ -27,12 +46,45 @@ class KochSnowflakeDrawer:
         if order < 0:
             raise ValueError("Order must be a non-negative integer.")
 
+        if self.fast:
+            self.show(order)
+            # Vertex lists are cached, so stepping through orders is instant.
+            limit = max(order, self.max_fast_order)
+            self._screen.onkey(lambda: self.show(min(self._order + 1, limit)), "Up")
+            self._screen.onkey(lambda: self.show(max(self._order - 1, 0)), "Down")
+            self._screen.listen()
+            self._screen.mainloop()
+            return
+
         self._prepare_starting_position()
         for _ in range(3):
             self._draw_segment(order, self.line_length)
             self._turtle.right(120)
         self._screen.mainloop()
 
+    def show(self, order: int) -> None:
+        """Draw ``order`` in fast mode, replacing the current drawing.
+
+        Tracing is off while the precomputed vertices are joined by ``goto``
+        runs, and the screen is refreshed only every ``refresh_every``
+        segments instead of after each one.
+        """
+        if order < 0:
+            raise ValueError("Order must be a non-negative integer.")
+        self._order = order
+        vertices = cached_vertices(order, float(self.line_length))
+        self._screen.tracer(0)
+        self._turtle.clear()
+        self._turtle.penup()
+        self._turtle.goto(vertices[0])
+        self._turtle.pendown()
+        goto, update = self._turtle.goto, self._screen.update
+        step = self.refresh_every
+        for start in range(1, len(vertices), step):
+            for point in vertices[start : start + step]:
+                goto(point)
+            update()
+
     def _prepare_starting_position(self) -> None:
         self._turtle.penup()
         self._turtle.setheading(0)
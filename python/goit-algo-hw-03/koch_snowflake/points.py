@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from .stream import SVG_END, WRITE_BUFFER_SIZE, open_svg
+
+try:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+except ImportError:  # pragma: no cover - PNG export is optional
+    Figure = None
+
+# Turning left by 60 degrees, as the turtle does before the peak of a bump.
+PEAK_TURN = np.exp(1j * np.pi / 3)
+
+
+def base_triangle(length: float) -> np.ndarray:
+    # Same start and direction as KochSnowflakeDrawer: from (-L/2, L/3)
+    # heading east, turning right by 120 degrees after every edge.
+    start = complex(-length / 2, length / 3)
+    corners = start + length * np.exp(-2j * np.pi / 3 * np.arange(3)).cumsum()
+    return np.concatenate(([start], corners))
+
+
+def refine(vertices: np.ndarray) -> np.ndarray:
+    """Replace every edge of a closed complex polyline by four Koch edges."""
+    starts = vertices[:-1]
+    thirds = (vertices[1:] - starts) / 3
+    refined = np.empty(4 * len(starts) + 1, dtype=np.complex128)
+    refined[0:-1:4] = starts
+    refined[1::4] = starts + thirds
+    refined[2::4] = starts + thirds * (1 + PEAK_TURN)
+    refined[3::4] = starts + 2 * thirds
+    refined[-1] = vertices[-1]
+    return refined
+
+
+def snowflake_vertices(order: int, length: float = 300.0) -> np.ndarray:
+    """Return the closed snowflake outline as an ``(3 * 4**order + 1, 2)`` array.
+
+    Each order is computed from the previous one with a few whole-array
+    operations, so the cost per vertex stays in NumPy rather than Python.
+    """
+    if order < 0:
+        raise ValueError("Order must be a non-negative integer.")
+    vertices = base_triangle(length)
+    for _ in range(order):
+        vertices = refine(vertices)
+    return np.column_stack((vertices.real, vertices.imag))
+
+
+def write_svg(
+    points: np.ndarray,
+    path: Path,
+    stroke: str = "#195d9d",
+    background: str = "#f7fbff",
+    stroke_width: float = 1.0,
+    precision: int = 2,
+) -> None:
+    minimum, maximum = points.min(axis=0), points.max(axis=0)
+    with path.open("w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as handle:
+        dx, dy = open_svg(
+            handle,
+            (*minimum, *maximum),
+            stroke,
+            background,
+            stroke_width,
+            precision,
+        )
+        flipped = np.column_stack((points[:, 0] + dx, dy - points[:, 1]))
+        np.savetxt(handle, flipped, fmt=f"%.{precision}f", delimiter=",", newline=" ")
+        handle.write(SVG_END)
+
+
+def write_png(
+    points: np.ndarray,
+    path: Path,
+    stroke: str = "#195d9d",
+    background: str = "#f7fbff",
+    size: int = 1024,
+    line_width: float = 0.5,
+) -> None:
+    if Figure is None:
+        raise RuntimeError("PNG export requires matplotlib to be installed.")
+    # The Agg canvas renders off-screen, so no display is needed.
+    figure = Figure(figsize=(size / 100, size / 100), dpi=100, facecolor=background)
+    FigureCanvasAgg(figure)
+    axes = figure.add_axes((0, 0, 1, 1))
+    axes.set_axis_off()
+    axes.set_aspect("equal")
+    axes.plot(points[:, 0], points[:, 1], color=stroke, linewidth=line_width)
+    figure.savefig(path, facecolor=background)
+
+
+def export(points: np.ndarray, path: Path) -> None:
+    suffix = path.suffix.lower()
+    if suffix == ".svg":
+        write_svg(points, path)
+    elif suffix == ".png":
+        write_png(points, path)
+    else:
+        raise ValueError("Output file must end with .svg or .png.")
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import IO, Iterator, List, Tuple
+
+WRITE_BUFFER_SIZE = 1 << 20
+BATCH_SIZE = 8192
+
+# Unit steps for headings 0, 60, ..., 300 degrees on a triangular lattice
+# with basis (1, 0) and (1/2, sqrt(3)/2). Every vertex of an order-k
+# snowflake lies on the lattice with spacing length / 3**k, so positions are
+# tracked as exact integers and never drift, however many segments follow.
+STEPS = ((1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1))
+# Heading of each of the four parts of a Koch edge relative to the edge
+# itself, in units of 60 degrees.
+TURNS = (0, 1, -1, 0)
+STREAM_FORMATS = (".svg", ".txt")
+SVG_END = '"/>\n</svg>\n'
+
+
+def open_svg(
+    handle: IO[str],
+    bounds: Tuple[float, float, float, float],
+    stroke: str,
+    background: str,
+    stroke_width: float,
+    precision: int,
+) -> Tuple[float, float]:
+    """Write an SVG prologue that leaves the outline's ``points`` open.
+
+    ``bounds`` is ``(left, bottom, right, top)``. Returns ``(dx, dy)``: a
+    point is drawn at ``(x + dx, dy - y)``, since SVG's y axis points down.
+    The document is finished by writing ``SVG_END``.
+    """
+    left, bottom, right, top = bounds
+    margin = stroke_width * 2
+    width = right - left + 2 * margin
+    height = top - bottom + 2 * margin
+    handle.write(
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'viewBox="0 0 {width:.{precision}f} {height:.{precision}f}">\n'
+        f'<rect width="100%" height="100%" fill="{background}"/>\n'
+        f'<polygon fill="none" stroke="{stroke}" '
+        f'stroke-width="{stroke_width}" points="'
+    )
+    return margin - left, top + margin
+
+
+def iter_headings(order: int) -> Iterator[int]:
+    """Yield the heading of every segment of one Koch edge, in order.
+
+    The segment number is kept as ``order`` base-4 digits with the heading
+    they imply, so advancing to the next segment is amortized O(1) and the
+    only state is the O(order) digit stack.
+    """
+    digits = [0] * order
+    heading = 0
+    while True:
+        yield heading
+        level = order - 1
+        while level >= 0 and digits[level] == 3:
+            # Parts 0 and 3 have the same direction, so resetting a finished
+            # digit leaves the heading unchanged.
+            digits[level] = 0
+            level -= 1
+        if level < 0:
+            return
+        digit = digits[level]
+        heading += TURNS[digit + 1] - TURNS[digit]
+        digits[level] = digit + 1
+
+
+def iter_lattice(order: int) -> Iterator[Tuple[int, int]]:
+    """Yield the closed snowflake outline as integer lattice coordinates."""
+    a = b = 0
+    yield a, b
+    for edge in range(3):
+        # The turtle turns right by 120 degrees (two steps) after each edge.
+        base = -2 * edge
+        for heading in iter_headings(order):
+            step_a, step_b = STEPS[(base + heading) % 6]
+            a += step_a
+            b += step_b
+            yield a, b
+
+
+def iter_points(order: int, length: float = 300.0) -> Iterator[Tuple[float, float]]:
+    if order < 0:
+        raise ValueError("Order must be a non-negative integer.")
+    spacing = length / 3**order
+    height = spacing * math.sqrt(3) / 2
+    x0, y0 = -length / 2, length / 3
+    for a, b in iter_lattice(order):
+        yield x0 + spacing * a + spacing / 2 * b, y0 + height * b
+
+
+def write_stream(
+    order: int,
+    length: float,
+    path: Path,
+    stroke: str = "#195d9d",
+    background: str = "#f7fbff",
+    stroke_width: float = 1.0,
+    precision: int = 2,
+) -> int:
+    """Write the snowflake to ``path`` without materializing its vertices.
+
+    ``.svg`` files get a single polygon, ``.txt`` files one ``x y`` pair per
+    line. Returns the number of vertices written.
+    """
+    suffix = path.suffix.lower()
+    if suffix not in STREAM_FORMATS:
+        raise ValueError("Streamed output must end with .svg or .txt.")
+    if order < 0:
+        raise ValueError("Order must be a non-negative integer.")
+
+    svg = suffix == ".svg"
+    # Vertices of order 1 stay vertices at every higher order and the curve
+    # never leaves their convex hull, so they give the exact bounding box.
+    outline = list(iter_points(min(order, 1), length))
+    xs, ys = [x for x, _ in outline], [y for _, y in outline]
+    number = f"{{:.{precision}f}}"
+    pattern = f"{number},{number} " if svg else f"{number} {number}\n"
+
+    count = 0
+    with path.open("w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as handle:
+        if svg:
+            dx, dy = open_svg(
+                handle,
+                (min(xs), min(ys), max(xs), max(ys)),
+                stroke,
+                background,
+                stroke_width,
+                precision,
+            )
+        batch: List[str] = []
+        render = pattern.format
+        for x, y in iter_points(order, length):
+            if svg:
+                x, y = x + dx, dy - y
+            batch.append(render(x, y))
+            if len(batch) == BATCH_SIZE:
+                handle.write("".join(batch))
+                count += len(batch)
+                batch.clear()
+        handle.write("".join(batch))
+        count += len(batch)
+        if svg:
+            handle.write(SVG_END)
+    return count